@@ -0,0 +1,57 @@
+"""
+JSON source loading with each installed backend.
+
+Run with `python benchmarks/bench_json.py [DIRECTORY]`. Without a directory, a
+corpus of synthetic dashboards is generated in a temporary directory. Each
+backend loads every `*.json` file below the directory from raw bytes; the
+"json (text)" row is the former read_text + json.loads path.
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from doc_inject.parsers.json import JSON_BACKENDS, _backend
+
+
+def write_corpus(directory: Path, count: int = 10000):
+    for i in range(count):
+        panels = [
+            {"id": p, "type": "timeseries", "title": f"Panel {p}", "targets": [{"expr": f"up{p}"}]}
+            for p in range(20)
+        ]
+        dashboard = {"uid": f"uid-{i}", "title": f"Dashboard {i}", "panels": panels}
+        (directory / f"dashboard-{i}.json").write_text(json.dumps(dashboard))
+
+
+def timed(load, paths) -> float:
+    started = time.perf_counter()
+    for path in paths:
+        load(path)
+    return time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(tmp)
+        if len(sys.argv) <= 1:
+            write_corpus(directory)
+        paths = sorted(directory.rglob("*.json"))
+
+        print(f"{len(paths)} files")
+        text = timed(lambda path: json.loads(path.read_text(encoding="utf-8")), paths)
+        print(f"{'json (text)':<14}{text:>9.3f}s")
+        for name in JSON_BACKENDS:
+            try:
+                loads = _backend(name)[0]
+            except ValueError:
+                print(f"{name:<14}{'not installed':>14}")
+                continue
+            seconds = timed(lambda path: loads(path.read_bytes()), paths)
+            print(f"{name:<14}{seconds:>9.3f}s{text / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Peak memory and time of a streamed JSON query versus a full load.
+
+Run with `python benchmarks/bench_json_stream.py [FILE [QUERY ...]]`. Without
+arguments, an OpenAPI-like bundle of roughly 300 MB is generated in a
+temporary directory. Each measurement runs in a fresh process so peak RSS is
+not shared between them.
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+MEASURE = """
+import os, resource, sys, time
+os.environ["DOC_INJECT_JSON_STREAM_BYTES"] = sys.argv[3]
+from pathlib import Path
+from doc_inject.parsers.json import parse_json
+started = time.perf_counter()
+parse_json(Path(sys.argv[1]), sys.argv[2])
+print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_bundle(path: Path, operations: int = 400000):
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write('{"openapi": "3.1.0", "info": {"title": "Bundle", "version": "2.4.0"}, "paths": {')
+        for i in range(operations):
+            operation = {
+                "get": {
+                    "operationId": f"op{i}",
+                    "parameters": [{"name": f"p{j}", "in": "query"} for j in range(5)],
+                    "responses": {"200": {"description": "ok " * 20}},
+                }
+            }
+            fh.write(
+                ("," if i else "") + json.dumps(f"/resource/{i}") + ":" + json.dumps(operation)
+            )
+        fh.write('}, "components": {"schemas": {"Error": {"type": "object"}}}}')
+
+
+def measure(path: Path, query: str, threshold: str):
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE, str(path), query, threshold],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(output[0]), int(output[1]) // 1024
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            path, queries = Path(sys.argv[1]), sys.argv[2:] or ["$.info.version"]
+        else:
+            path, queries = Path(tmp) / "bundle.json", ["$.info.version", "$.components"]
+            started = time.perf_counter()
+            write_bundle(path)
+            print(
+                f"generated {path.stat().st_size >> 20} MiB in {time.perf_counter() - started:.1f}s"
+            )
+
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+        print(f"(this process: {baseline} MiB)")
+        print(f"{'query':<20}{'mode':<8}{'time':>9}{'peak RSS':>12}")
+        for query in queries:
+            for mode, threshold in (("stream", "0"), ("load", str(1 << 62))):
+                seconds, peak = measure(path, query, threshold)
+                print(f"{query:<20}{mode:<8}{seconds:>8.2f}s{peak:>8} MiB")
+
+
+if __name__ == "__main__":
+    main()
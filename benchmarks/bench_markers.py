@@ -0,0 +1,75 @@
+"""
+Marker scanning on pathological documents.
+
+Compares the single-pass tokenizer in `doc_inject.engine` with the former
+backreference regex. Run with `python benchmarks/bench_markers.py`; the time per
+marker of the tokenizer stays flat as documents grow, while the regex rescans
+the rest of the document from every unclosed START.
+"""
+
+import re
+import time
+
+from doc_inject.engine import MarkerPairer, iter_markers
+
+# The block pattern used before the tokenizer, kept here for comparison.
+LEGACY_PATTERN = re.compile(
+    r"""
+    (?P<start>
+        (?:<!--|//|\#|\;) \s* DOC_INJECT_START \s+ (?P<name>[\w\-]+) \s* (?:-->)?
+    )
+    (?P<content>.*?)
+    (?P<end>
+        (?:<!--|//|\#|\;) \s* DOC_INJECT_END \s+ \2 \s* (?:-->)?
+    )
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+# The regex is quadratic on unclosed STARTs; 4000 of them take minutes.
+LEGACY_LIMIT = 2000
+
+
+def unclosed_starts(n: int) -> str:
+    """Every START lacks its END, so each one rescans the rest of the document."""
+    return "".join(f"<!-- DOC_INJECT_START block{i} -->\ntext\n" for i in range(n))
+
+
+def well_formed(n: int) -> str:
+    """The common case, for reference: closed blocks with names sharing a prefix."""
+    return "".join(
+        f"<!-- DOC_INJECT_START block{i} -->\ntext\n<!-- DOC_INJECT_END block{i} -->\n"
+        for i in range(n)
+    )
+
+
+def tokenize(content: str) -> int:
+    pairer = MarkerPairer()
+    blocks = sum(pairer.feed(marker) is not None for marker in iter_markers(content))
+    # unmatched markers are reported by `finish`; the benchmark only counts blocks
+    return blocks
+
+
+def legacy(content: str) -> int:
+    return sum(1 for _ in LEGACY_PATTERN.finditer(content))
+
+
+def timed(function, content: str) -> float:
+    started = time.perf_counter()
+    function(content)
+    return time.perf_counter() - started
+
+
+def main():
+    print(f"{'input':<16}{'markers':>10}{'tokenizer':>14}{'legacy regex':>16}")
+    for build in (unclosed_starts, well_formed):
+        for n in (500, 1000, 2000, 4000, 8000, 16000, 32000):
+            content = build(n)
+            markers = content.count("DOC_INJECT_")
+            new = timed(tokenize, content)
+            old = f"{timed(legacy, content):.4f}s" if n <= LEGACY_LIMIT else "-"
+            print(f"{build.__name__:<16}{markers:>10}{new:>13.4f}s{old:>16}")
+
+
+if __name__ == "__main__":
+    main()
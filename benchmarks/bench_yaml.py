@@ -0,0 +1,52 @@
+"""
+YAML loading with libyaml's CSafeLoader versus the pure-Python SafeLoader.
+
+Run with `python benchmarks/bench_yaml.py`. The document resembles a large
+Helm values file: nested mappings, lists and scalars of every common type.
+"""
+
+import time
+
+import yaml
+
+from doc_inject.parsers.yaml import YAML_BACKEND
+
+
+def values_document(services: int) -> bytes:
+    lines = ["services:"]
+    for i in range(services):
+        lines += [
+            f"  service-{i}:",
+            f"    image: registry.example.com/team/service-{i}:1.{i % 10}.0",
+            f"    replicas: {i % 5 + 1}",
+            "    enabled: true",
+            "    resources:",
+            "      limits: {cpu: 500m, memory: 256Mi}",
+            "    env:",
+            *(f"      - {{name: VAR_{j}, value: 'value {j}'}}" for j in range(5)),
+        ]
+    return "\n".join(lines).encode("utf-8")
+
+
+def timed(loader, data: bytes) -> float:
+    started = time.perf_counter()
+    yaml.load(data, Loader=loader)
+    return time.perf_counter() - started
+
+
+def main():
+    print(f"active backend: {YAML_BACKEND}")
+    csafe = getattr(yaml, "CSafeLoader", None)
+    print(f"{'size':>10}{'SafeLoader':>14}{'CSafeLoader':>14}{'speedup':>10}")
+    for services in (100, 1000, 5000):
+        data = values_document(services)
+        slow = timed(yaml.SafeLoader, data)
+        if csafe is None:
+            print(f"{len(data):>10}{slow:>13.3f}s{'-':>14}{'-':>10}")
+            continue
+        fast = timed(csafe, data)
+        print(f"{len(data):>10}{slow:>13.3f}s{fast:>13.3f}s{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,30 @@
 import os
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import typer
 
-from doc_inject.config import InjectConfig
-from doc_inject.engine import inject_from_file
+if TYPE_CHECKING:
+    from doc_inject.config_loader import ExternalConfig
+    from doc_inject.render_cache import RenderCache
 
 app = typer.Typer(help="Inject rendered content into documents using config-driven templates.")
+cache_app = typer.Typer(help="Manage the on-disk render cache.")
+app.add_typer(cache_app, name="cache")
+
+
+class EngineMode(str, Enum):
+    text = "text"
+    stream = "stream"
+    mmap = "mmap"
+
+
+class JsonBackend(str, Enum):
+    auto = "auto"
+    orjson = "orjson"
+    ujson = "ujson"
+    json = "json"
 
 
 @app.command()
@@ -15,19 +32,259 @@ def run(
     files: list[Path] = typer.Argument(...),
     config: Optional[Path] = None,
     config_query: Optional[str] = None,
+    check: bool = typer.Option(
+        False, "--check", help="Write nothing; exit 1 if a file would change."
+    ),
+    jobs: Optional[int] = typer.Option(
+        None, "--jobs", "-j", min=1, help="Number of worker processes (default: CPU count)."
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", envvar="DOC_INJECT_CACHE_DIR", help="Reuse rendered blocks from here."
+    ),
+    cache_max_bytes: Optional[int] = typer.Option(
+        None, "--cache-max-bytes", min=0, help="Prune the render cache to this size after the run."
+    ),
+    engine: EngineMode = typer.Option(
+        EngineMode.text, "--engine", help="How targets are read and written; see the README."
+    ),
+    json_backend: Optional[JsonBackend] = typer.Option(
+        None,
+        "--json-backend",
+        envvar="DOC_INJECT_JSON_BACKEND",
+        help="JSON parser for sources and configs (default: fastest installed).",
+    ),
+):
+    from doc_inject.parsers.cache import clear_source_cache
+    from doc_inject.parsers.json import set_json_backend
+    from doc_inject.walker import shared_listings
+
+    clear_source_cache()
+
+    backend = json_backend.value if json_backend else None
+    try:
+        set_json_backend(backend)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1)
+
+    external = _load_external_config(config, config_query)
+
+    render_cache = None
+    if cache_dir:
+        from doc_inject.render_cache import DEFAULT_MAX_BYTES, RenderCache
+
+        limit = DEFAULT_MAX_BYTES if cache_max_bytes is None else cache_max_bytes
+        render_cache = RenderCache(cache_dir, limit)
+
+    tasks = [(file, check, engine.value) for file in files]
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(external, render_cache, backend),
+        ) as pool:
+            results = list(
+                pool.map(_run_file, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+            )
+    else:
+        _init_worker(external, render_cache, backend)
+        with shared_listings():
+            results = [_run_file(task) for task in tasks]
+
+    if render_cache:
+        render_cache.prune()
+
+    changed = [file for file, (updated, _) in zip(files, results) if updated]
+    failed = [(file, error) for file, (_, error) in zip(files, results) if error]
+
+    for file, error in failed:
+        typer.echo(f"{file}: {error}", err=True)
+
+    if check:
+        for file in changed:
+            typer.echo(f"would update {file}")
+
+    if failed or (check and changed):
+        raise typer.Exit(code=1)
+
+
+class DepsFormat(str, Enum):
+    json = "json"
+    make = "make"
+    ninja = "ninja"
+
+
+@app.command()
+def deps(
+    files: list[Path] = typer.Argument(...),
+    config: Optional[Path] = None,
+    config_query: Optional[str] = None,
+    fmt: DepsFormat = typer.Option(DepsFormat.json, "--format", "-f"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write here, not stdout."),
+):
+    """Print the sources each target depends on, without rendering anything."""
+    from doc_inject.graph import (
+        DependencyGraph,
+        dependencies,
+        format_json,
+        format_make,
+        format_ninja,
+    )
+    from doc_inject.walker import shared_listings
+
+    graph = DependencyGraph(_load_external_config(config, config_query))
+    failed = False
+    with shared_listings():
+        for file in files:
+            try:
+                graph.add_target(file)
+            except Exception as e:
+                typer.echo(f"{file}: {e}", err=True)
+                failed = True
+
+    if failed:
+        raise typer.Exit(code=1)
+
+    formatter = {"json": format_json, "make": format_make, "ninja": format_ninja}[fmt.value]
+    text = formatter(dependencies(graph, config))
+    if output:
+        output.write_text(text, encoding="utf-8")
+    else:
+        typer.echo(text, nl=False)
+
+
+@app.command()
+def watch(
+    files: list[Path] = typer.Argument(...),
+    config: Optional[Path] = None,
+    config_query: Optional[str] = None,
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", envvar="DOC_INJECT_CACHE_DIR", help="Reuse rendered blocks from here."
+    ),
+    polling: bool = typer.Option(False, "--polling", help="Poll mtimes instead of using inotify."),
+    interval: float = typer.Option(
+        0.5, "--interval", min=0.05, help="Polling interval in seconds."
+    ),
+    debounce: float = typer.Option(
+        0.2, "--debounce", min=0, help="Quiet period before re-rendering."
+    ),
 ):
-    from doc_inject.config_loader import extract_config_from_document, extract_config_from_file
+    """Re-render affected blocks whenever their sources change."""
+    from doc_inject.parsers.text import set_line_index_directory
+    from doc_inject.render_cache import RenderCache
+    from doc_inject.watch import WatchSession, create_watcher
+    from doc_inject.watch import watch as watch_session
 
-    for file in files:
-        base_path = Path(os.path.dirname(os.path.realpath(file)))
+    external = _load_external_config(config, config_query)
+    render_cache = RenderCache(cache_dir) if cache_dir else None
+    set_line_index_directory(render_cache.line_indexes if render_cache else None)
+    session = WatchSession(
+        files,
+        external=external,
+        config_path=config,
+        config_query=config_query,
+        cache=render_cache,
+    )
 
-        config: InjectConfig = (
-            extract_config_from_file(config, query=config_query).with_base_path(base_path)
-            if config
-            else extract_config_from_document(file).with_base_path(base_path)
+    try:
+        watch_session(
+            session, create_watcher(polling, interval), debounce=debounce, report=typer.echo
         )
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def backends():
+    """Show which parser backends are in use."""
+    from doc_inject.parsers.json import json_backend
+    from doc_inject.parsers.yaml import YAML_BACKEND
+
+    typer.echo(f"json: {json_backend()}")
+    typer.echo(f"yaml: {YAML_BACKEND}")
+
+
+@cache_app.command()
+def prune(
+    cache_dir: Path = typer.Option(
+        Path(".doc-inject-cache"), "--cache-dir", envvar="DOC_INJECT_CACHE_DIR"
+    ),
+    max_bytes: Optional[int] = typer.Option(
+        None, "--max-bytes", min=0, help="Target size (default: 64 MiB; 0 clears the cache)."
+    ),
+):
+    from doc_inject.render_cache import RenderCache
+
+    removed, remaining = RenderCache(cache_dir).prune(max_bytes)
+    typer.echo(f"removed {removed} entries, {remaining} bytes remaining")
+
+
+def _load_external_config(
+    config: Optional[Path], config_query: Optional[str]
+) -> Optional["ExternalConfig"]:
+    """The parsed `--config`, if given; a config that fails to load ends the command."""
+    if not config:
+        return None
+
+    from doc_inject.config_loader import ExternalConfig
+
+    try:
+        return ExternalConfig.load(config, query=config_query)
+    except Exception as e:
+        typer.echo(f"{config}: {e}", err=True)
+        raise typer.Exit(code=1)
+
+
+# Parsed `--config` and render cache, shared by all targets handled in this process.
+_EXTERNAL_CONFIG: Optional["ExternalConfig"] = None
+_RENDER_CACHE: Optional["RenderCache"] = None
+
+
+def _init_worker(
+    external: Optional["ExternalConfig"],
+    render_cache: Optional["RenderCache"],
+    json_backend: Optional[str] = None,
+):
+    from doc_inject.parsers.json import set_json_backend
+    from doc_inject.parsers.text import set_line_index_directory
+
+    global _EXTERNAL_CONFIG, _RENDER_CACHE
+    _EXTERNAL_CONFIG = external
+    _RENDER_CACHE = render_cache
+    set_json_backend(json_backend)
+    set_line_index_directory(render_cache.line_indexes if render_cache else None)
+
+
+def _run_file(task: Tuple[Path, bool, str]) -> Tuple[bool, Optional[str]]:
+    """Process one target; errors are returned rather than raised so the run can report them all."""
+    from doc_inject.walker import shared_listings
+
+    file, check, engine = task
+
+    try:
+        with shared_listings():
+            return _inject(file, check, engine), None
+    except Exception as e:
+        return False, str(e)
+
+
+def _inject(file: Path, check: bool, engine: str = "text") -> bool:
+    from doc_inject.config_loader import load_target_config
+    from doc_inject.engine import has_markers, inject_from_file
+
+    # documents without markers need neither a config nor any parser
+    if not has_markers(file):
+        return False
+
+    file_config = load_target_config(file, _EXTERNAL_CONFIG)
 
-        inject_from_file(file, config=config)
+    return inject_from_file(
+        file, config=file_config, check=check, cache=_RENDER_CACHE, engine=engine
+    )
 
 
 app.command(name=None)(run)
@@ -1,7 +1,5 @@
-import os
-from glob import glob
 from pathlib import Path
-from typing import Annotated, Dict, Literal, Optional, Union
+from typing import Annotated, Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 from pydantic import (
     BaseModel,
@@ -11,11 +9,20 @@ from pydantic import (
 )
 from pydantic.types import StringConstraints
 
+from doc_inject.walker import first_match, glob_root, resolve_globs
+
 NonBlankStr = Annotated[str, StringConstraints(min_length=1)]
 
 
-def resolve_file_paths(file_pattern: str) -> list[Path]:
-    return [Path(p) for p in glob(file_pattern, recursive=True)]
+def resolve_file_paths(
+    file_pattern: Union[str, Sequence[str]], exclude: Sequence[str] = ()
+) -> list[Path]:
+    patterns = [file_pattern] if isinstance(file_pattern, str) else file_pattern
+    return resolve_globs(patterns, exclude)
+
+
+def first_matching_path(file_pattern: str, exclude: Sequence[str] = ()) -> Optional[Path]:
+    return first_match([file_pattern], exclude)
 
 
 ParserType = Literal["json", "yaml", "toml", "text"]
@@ -34,9 +41,16 @@ EXTENSION_TO_PARSER = {
 }
 
 
+def _as_list(value: Union[str, List[str], None]) -> List[str]:
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
 class InjectItem(BaseModel):
     file: Optional[Union[NonBlankStr, Path]] = None
-    glob: Optional[NonBlankStr] = None
+    glob: Optional[Union[NonBlankStr, List[NonBlankStr]]] = None
+    exclude: Optional[Union[NonBlankStr, List[NonBlankStr]]] = None
     parser: Optional[ParserType] = None
     query: Optional[NonBlankStr] = None
     vars: Optional[Dict[str, NonBlankStr]] = None
@@ -44,39 +58,74 @@ class InjectItem(BaseModel):
     strict_template: Optional[bool] = None
 
     _base_path: Optional[Path] = PrivateAttr(default=None)
-    _resolved_files: list[Path] = PrivateAttr(default_factory=list)
+    _resolved: Optional[list[Path]] = PrivateAttr(default=None)
 
     def set_base_path(self, base: Path):
         self._base_path = base.resolve()
-        self._resolve_paths()
-
-    def _resolve_paths(self):
-        base_dir = Path(self._base_path) or Path.cwd()
-
+        self._resolved = None
+
+    @property
+    def _resolved_files(self) -> list[Path]:
+        """Source files of this item, resolved on first access."""
+        if self._resolved is None:
+            self._resolved = self._resolve_paths()
+        return self._resolved
+
+    def reset_resolved_files(self):
+        """Forget resolved sources, e.g. after files were created or deleted."""
+        self._resolved = None
+
+    def glob_roots(self) -> list[Path]:
+        """Directories walked to resolve `glob`; empty for `file` items."""
+        base_dir = Path(self._base_path or Path.cwd())
+        return [glob_root((base_dir / p).as_posix()) for p in _as_list(self.glob)]
+
+    def glob_patterns(self) -> Tuple[List[str], List[str]]:
+        """Absolute `glob` and `exclude` patterns of this item."""
+        base_dir = Path(self._base_path or Path.cwd())
+        return (
+            [(base_dir / p).as_posix() for p in _as_list(self.glob)],
+            [(base_dir / p).as_posix() for p in _as_list(self.exclude)],
+        )
+
+    def _resolve_paths(self) -> list[Path]:
         if self.glob:
-            pattern = (base_dir / self.glob).as_posix()
-            self._resolved_files = resolve_file_paths(pattern)
+            return resolve_file_paths(*self.glob_patterns())
+
+        base_dir = Path(self._base_path or Path.cwd())
+        return [(base_dir / self.file).resolve()]
 
+    def _source_extension(self) -> str:
         if self.file:
-            path = (base_dir / self.file).resolve()
-            self._resolved_files = [path]
+            return Path(self.file).suffix.lower()
+
+        pattern = _as_list(self.glob)[0]
+        suffix = Path(pattern).suffix.lower()
+        if suffix and not any(c in suffix for c in "*?["):
+            return suffix
+
+        # wildcard extension: peek at the first match instead of resolving the whole glob
+        base_dir = Path(self._base_path or Path.cwd())
+        _, exclude = self.glob_patterns()
+        first = first_matching_path((base_dir / pattern).as_posix(), exclude)
+        return first.suffix.lower() if first else ""
 
     @model_validator(mode="after")
     def validate_and_normalize(self) -> "InjectItem":
         if bool(self.file) == bool(self.glob):
             raise ValueError("Exactly one of 'file' or 'glob' must be provided.")
+        if self.exclude and not self.glob:
+            raise ValueError("'exclude' can only be used together with 'glob'.")
 
         if not self.query and not self.vars:
             raise ValueError("Either 'query' or 'vars' must be defined.")
         if self.query and self.vars:
             raise ValueError("Provide either 'query' or 'vars', not both.")
 
-        self._base_path = os.getcwd()
-        self._resolve_paths()
-
-        ext = f".{([*[x.as_posix() for x in self._resolved_files], ''][0]).rpartition('.')[-1].lower()}"
+        self._base_path = Path.cwd()
 
         if not self.parser:
+            ext = self._source_extension()
             inferred = EXTENSION_TO_PARSER.get(ext)
             if not inferred:
                 raise ValueError(f"Cannot infer parser from file extension '{ext}'")
@@ -93,3 +142,7 @@ class InjectConfig(RootModel[Dict[str, InjectItem]]):
         for item in self.root.values():
             item.set_base_path(path)
         return self
+
+    def rebased(self, path: Path) -> "InjectConfig":
+        """Return a copy with all items resolved relative to `path`, leaving this config as is."""
+        return self.model_copy(deep=True).with_base_path(path)
@@ -1,27 +1,13 @@
-import json
+import os
 import re
-import sys
 import textwrap
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
-import json5
-import yaml
-
-from doc_inject.config import InjectConfig
-
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
-
-
-def _dedent_after_directive(block: list[str]) -> str:
-    return textwrap.dedent(
-        "\n".join(
-            block[1:] if block and block[0].strip().startswith("doc-inject:configure") else block
-        )
-    )
+# The config model and the config format's parser are imported once a config
+# is actually read.
+if TYPE_CHECKING:
+    from doc_inject.config import InjectConfig
 
 
 COMMENT_SYNTAX = {
@@ -41,32 +27,28 @@ COMMENT_SYNTAX = {
 }
 
 
-def extract_config_from_document(path: Path) -> InjectConfig:
-    ext_chain = _get_extension_chain(path)
-    content = path.read_text(encoding="utf-8")
+def extract_config_from_document(path: Path) -> "InjectConfig":
+    from doc_inject.config import InjectConfig
 
-    for ext in ext_chain:
-        if ext not in COMMENT_SYNTAX:
-            continue
+    block = _find_config_block(path, _get_extension_chain(path))
 
-        prefix, suffix = COMMENT_SYNTAX[ext]
-        block = _extract_comment_block(content, prefix, suffix, ext)
-
-        if block:
-            try:
-                config_data = _parse_structured_config(block)
-                return InjectConfig.model_validate(config_data)
-            except Exception as e:
-                raise ValueError(f"Config block found but failed to parse: {e}")
+    if block:
+        try:
+            config_data = _parse_structured_config(block)
+            return InjectConfig.model_validate(config_data)
+        except Exception as e:
+            raise ValueError(f"Config block found but failed to parse: {e}")
 
     raise ValueError(f"No usable config block found in {path}")
 
 
-def extract_config_from_file(path: Path, query: str | None = None) -> InjectConfig:
+def extract_config_from_file(path: Path, query: str | None = None) -> "InjectConfig":
+    from doc_inject.config import InjectConfig
+
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
 
-    content = path.read_text(encoding="utf-8")
+    raw = path.read_bytes()
     ext = path.suffix.lower()
 
     if ext == ".toml" and not query:
@@ -74,13 +56,21 @@ def extract_config_from_file(path: Path, query: str | None = None) -> InjectConf
 
     try:
         if ext == ".json":
-            data = json.loads(content)
+            from doc_inject.parsers.json import loads_json
+
+            data = loads_json(raw)
         elif ext == ".json5":
-            data = json5.loads(content)
+            from doc_inject.parsers.json import loads_json5
+
+            data = loads_json5(raw)
         elif ext in {".yaml", ".yml"}:
-            data = yaml.safe_load(content)
+            from doc_inject.parsers.yaml import load_yaml
+
+            data = load_yaml(raw)
         elif ext == ".toml":
-            data = tomllib.loads(content)
+            from doc_inject.parsers.toml import load_toml
+
+            data = load_toml(raw)
         else:
             raise ValueError(f"Unsupported config file format: {ext}")
     except Exception as e:
@@ -97,6 +87,36 @@ def extract_config_from_file(path: Path, query: str | None = None) -> InjectConf
     return InjectConfig.model_validate(data)
 
 
+class ExternalConfig:
+    """
+    A config file passed via `--config`, parsed and validated once per invocation.
+    Targets receive copies rebased to their own directory, cached per directory.
+    """
+
+    def __init__(self, config: "InjectConfig"):
+        self.config = config
+        self._rebased: Dict[Path, "InjectConfig"] = {}
+
+    @classmethod
+    def load(cls, path: Path, query: str | None = None) -> "ExternalConfig":
+        return cls(extract_config_from_file(path, query=query))
+
+    def for_target(self, file: Path) -> "InjectConfig":
+        base_path = Path(os.path.dirname(os.path.realpath(file)))
+        if base_path not in self._rebased:
+            self._rebased[base_path] = self.config.rebased(base_path)
+        return self._rebased[base_path]
+
+
+def load_target_config(file: Path, external: Optional[ExternalConfig] = None) -> "InjectConfig":
+    """Config for a target: the shared external config, or the target's inline block."""
+    if external:
+        return external.for_target(file)
+    return extract_config_from_document(file).with_base_path(
+        Path(os.path.dirname(os.path.realpath(file)))
+    )
+
+
 def _get_extension_chain(path: Path) -> list[str]:
     return list(reversed(path.name.split(".")[1:])) or ["html", "json"]
 
@@ -109,91 +129,172 @@ def _dedent_after_directive(block: list[str]) -> str:
     )
 
 
-def _extract_comment_block(text: str, prefix: str, suffix: str, ext: str) -> Optional[str]:
-    lines = text.splitlines()
-
-    if ext in ["asciidoc", "adoc"]:
-        for i, line in enumerate(lines):
-            if line.strip() == "////":
-                block = []
-                for inner in lines[i + 1 :]:
-                    if inner.strip() == "////":
-                        break
-                    block.append(inner)
-                if block and "doc-inject:configure" in block[0]:
-                    return _dedent_after_directive(block)
-
-        for i, line in enumerate(lines):
-            if line.strip().lower() == "[comment]" and i + 2 < len(lines):
-                if lines[i + 1].strip() == "--":
-                    block = []
-                    for inner in lines[i + 2 :]:
-                        if inner.strip() == "--":
-                            break
-                        block.append(inner)
-                    if block and "doc-inject:configure" in block[0]:
-                        return _dedent_after_directive(block)
-
-        for i, line in enumerate(lines):
-            if line.strip().lower() == "[comment]" and i + 1 < len(lines):
-                block = []
-                for inner in lines[i + 1 :]:
-                    if not inner.strip():
-                        break
-                    block.append(inner)
-                if block and "doc-inject:configure" in block[0]:
-                    return _dedent_after_directive(block)
-
-    # General line-comment pattern (supports //, #, ;)
-    if (prefix, suffix) in {("#", ""), ("//", ""), (";", "")}:
-        directive_pattern = re.compile(
-            rf"^{re.escape(prefix)}\s*doc-inject:configure\b", re.IGNORECASE
+def _find_config_block(path: Path, ext_chain: list[str]) -> Optional[str]:
+    """
+    The first `doc-inject:configure` block of `path` in any comment style of
+    its extensions. The file is read line by line and only up to that block.
+    """
+    scanner = ConfigBlockScanner(ext_chain)
+    if not scanner.styles:
+        return None
+
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            block = scanner.feed(line)
+            if block:
+                return block
+    return scanner.finish()
+
+
+class ConfigBlockScanner:
+    """
+    Finds a `doc-inject:configure` block in one pass over a document's lines.
+    All comment styles of the extensions in `ext_chain` are recognized at once:
+    line comments (`#`, `//`, `;`), block comments (`<!-- -->`, `{# #}`, which
+    may span lines) and, for AsciiDoc, `////` blocks and `[comment]` blocks
+    and paragraphs. `feed` returns the block's content as soon as it is
+    complete; `finish` returns one left open at the end of the document.
+    """
+
+    def __init__(self, ext_chain: list[str]):
+        syntaxes = [COMMENT_SYNTAX[ext] for ext in ext_chain if ext in COMMENT_SYNTAX]
+        self.styles = set(syntaxes)
+        self._asciidoc = any(ext in ("adoc", "asciidoc") for ext in ext_chain)
+        self._suffixes = {prefix: suffix for prefix, suffix in syntaxes if suffix}
+
+        line_prefixes = sorted({re.escape(prefix) for prefix, suffix in syntaxes if not suffix})
+        block_prefixes = sorted(re.escape(prefix) for prefix in self._suffixes)
+        alternatives = []
+        if line_prefixes:
+            alternatives.append(
+                rf"^\s*(?P<line>{'|'.join(line_prefixes)})\s*doc-inject:configure\b"
+            )
+        if block_prefixes:
+            alternatives.append(rf"(?P<block>{'|'.join(block_prefixes)})\s*doc-inject:configure")
+            # the directive may follow on a later line
+            alternatives.append(rf"(?P<opener>{'|'.join(block_prefixes)})\s*$")
+        self._directive = (
+            re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
         )
-        block_lines = []
-        found = False
-
-        for line in lines:
-            if directive_pattern.match(line.strip()):
-                found = True
-                continue
-            if found:
-                stripped = line.lstrip()
-                if stripped.startswith(prefix):
-                    content = stripped[len(prefix) :]
-                    block_lines.append(content.rstrip("\n"))
-                else:
-                    break
-        if block_lines:
-            return textwrap.dedent("\n".join(block_lines))
-
-    # Block-style (<!-- -->, {# #}) — support only inline single-block format
-    pattern = re.compile(
-        rf"{re.escape(prefix)}\s*doc-inject:configure\s*(.*?)\s*{re.escape(suffix)}",
-        re.DOTALL | re.IGNORECASE,
-    )
-    match = pattern.search(text)
-    return match.group(1).strip() if match else None
+
+        self._state: Optional[str] = None
+        self._delimiter = ""
+        self._block: Optional[list[str]] = None
+
+    def feed(self, line: str) -> Optional[str]:
+        stripped = line.strip()
+
+        if self._state == "delimited":
+            if stripped == self._delimiter:
+                return self._end_comment()
+            return self._append(line)
+
+        if self._state == "paragraph":
+            if not stripped:
+                return self._end_comment()
+            return self._append(line)
+
+        if self._state == "attribute":
+            # `[comment]` applies to a `--` block or to the following paragraph
+            if stripped == "--":
+                self._start("delimited", "--")
+                return None
+            self._start("paragraph")
+            return self.feed(line)
+
+        if self._state == "block":
+            return self._collect(line)
+
+        if self._state == "line":
+            repeated = self._directive.match(line)
+            if repeated and repeated.lastgroup == "line":
+                return None
+            content = line.lstrip()
+            if content.startswith(self._delimiter):
+                self._block.append(content[len(self._delimiter) :].rstrip("\n"))
+                return None
+            if self._block:
+                return textwrap.dedent("\n".join(self._block))
+            self._state = None
+
+        if self._state == "opener":
+            if not stripped:
+                return None
+            self._state = None
+            if stripped.lower().startswith("doc-inject:configure"):
+                self._start("block", self._suffixes[self._delimiter])
+                return self._collect(line.lstrip()[len("doc-inject:configure") :])
+
+        if self._asciidoc:
+            if stripped == "////":
+                self._start("delimited", "////")
+                return None
+            if stripped.lower() == "[comment]":
+                self._start("attribute")
+                return None
+
+        match = self._directive.search(line) if self._directive else None
+        if match is None:
+            return None
+        prefix = match.group(match.lastgroup)
+        if match.lastgroup == "line":
+            self._start("line", prefix)
+            return None
+        if match.lastgroup == "block":
+            self._start("block", self._suffixes[prefix])
+            return self._collect(line[match.end() :])
+        self._start("opener", prefix)
+        return None
+
+    def finish(self) -> Optional[str]:
+        if self._state in ("delimited", "paragraph"):
+            return self._end_comment()
+        if self._state == "line" and self._block:
+            return textwrap.dedent("\n".join(self._block))
+        return None
+
+    def _start(self, state: str, delimiter: str = ""):
+        self._state = state
+        self._delimiter = delimiter
+        self._block = []
+
+    def _append(self, line: str) -> None:
+        """Add a line to an AsciiDoc comment, dropping comments that are not a config."""
+        if self._block is not None:
+            if self._block or "doc-inject:configure" in line:
+                self._block.append(line.rstrip("\n"))
+            else:
+                self._block = None
+
+    def _end_comment(self) -> Optional[str]:
+        self._state = None
+        return _dedent_after_directive(self._block) if self._block else None
+
+    def _collect(self, text: str) -> Optional[str]:
+        """Add text to a block comment, up to its closing delimiter."""
+        end = text.find(self._delimiter)
+        if end == -1:
+            self._block.append(text)
+            return None
+        self._block.append(text[:end])
+        self._state = None
+        return "".join(self._block).strip() or None
 
 
 def _parse_structured_config(config_str: str) -> dict:
+    from doc_inject.parsers.json import loads_json5
+    from doc_inject.parsers.yaml import load_yaml
+
     try:
-        loaded = yaml.safe_load(config_str)
+        loaded = load_yaml(config_str)
         if isinstance(loaded, dict):
             return loaded
     except Exception:
         pass
 
     try:
-        loaded = json5.loads(config_str)
+        loaded = loads_json5(config_str.encode("utf-8"))
         if isinstance(loaded, dict):
             return loaded
     except Exception:
         raise ValueError("Unable to parse config block as YAML or JSON5.")
-
-
-def _dedent_after_directive(block: list[str]) -> str:
-    return textwrap.dedent(
-        "\n".join(
-            block[1:] if block and block[0].strip().startswith("doc-inject:configure") else block
-        )
-    )
@@ -1,42 +1,378 @@
+import mmap
+import os
 import re
 from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from doc_inject.files import AtomicFile, write_atomic
+
+if TYPE_CHECKING:
+    from doc_inject.config import InjectItem
+    from doc_inject.render_cache import RenderCache
+
+# A single START or END marker. `-->` may follow on a later line; a line comment
+# marker ends before its line break.
+MARKER_PATTERN = re.compile(
+    r"""
+    (?:<!--|//|\#|\;) \s* DOC_INJECT_(?P<kind>START|END) \s+ (?P<name>[\w\-]+)
+    (?:\s*-->|[\ \t]*)
+    """,
+    re.VERBOSE,
+)
 
-from doc_inject.config import InjectItem
-from doc_inject.parsers.core import resolve_query
-from doc_inject.template import render_template
+_BYTES_MARKER_PATTERN = re.compile(MARKER_PATTERN.pattern.encode("ascii"), re.VERBOSE)
 
-INJECT_BLOCK_PATTERN = re.compile(
+# The start of a marker that the following lines may still complete or extend.
+_MARKER_OPENERS = ("<!--", "//", "#", ";")
+_MARKER_TAIL = re.compile(
     r"""
-    (?P<start>
-        (?:<!--|//|\#|\;) \s* DOC_INJECT_START \s+ (?P<name>[\w\-]+) \s* (?:-->)?
-    )
-    (?P<content>.*?)
-    (?P<end>
-        (?:<!--|//|\#|\;) \s* DOC_INJECT_END \s+ \2 \s* (?:-->)?
-    )
+    (?:<!--|//|\#|\;) \s* (?:DOC_INJECT_(?:START|END) (?:\s+[\w\-]+)?)? \s* \Z
     """,
-    re.DOTALL | re.VERBOSE,
+    re.VERBOSE,
 )
 
+ENGINES = ("text", "stream", "mmap")
+
+
+class Marker(NamedTuple):
+    kind: str  # "START" or "END"
+    name: str
+    start: int
+    end: int
+    line: int
+
+
+def iter_markers(text: str, line: int = 1) -> Iterator[Marker]:
+    """All markers in `text` in one left-to-right pass; `line` is the number of its first line."""
+    last = 0
+    for match in MARKER_PATTERN.finditer(text):
+        line += text.count("\n", last, match.start())
+        last = match.start()
+        yield Marker(match.group("kind"), match.group("name"), match.start(), match.end(), line)
+
+
+class MarkerPairer:
+    """
+    Pairs START and END markers by name with a stack.
+    `feed` returns the (start, end) pair once an outermost block is closed; blocks
+    nested inside it are part of its content. Markers without a counterpart are
+    collected and reported by `finish`.
+    """
+
+    def __init__(self):
+        self.open: List[Marker] = []
+        self.unmatched: List[Marker] = []
+        self._positions: Dict[str, List[int]] = {}
+
+    @property
+    def depth(self) -> int:
+        return len(self.open)
+
+    def feed(self, marker: Marker) -> Optional[Tuple[Marker, Marker]]:
+        if marker.kind == "START":
+            self._positions.setdefault(marker.name, []).append(len(self.open))
+            self.open.append(marker)
+            return None
+
+        positions = self._positions.get(marker.name)
+        if not positions:
+            self.unmatched.append(marker)
+            return None
+
+        index = positions[-1]
+        # STARTs opened after the matching one can no longer be closed
+        for dangling in self.open[index + 1 :]:
+            self._positions[dangling.name].pop()
+            self.unmatched.append(dangling)
+        positions.pop()
+        start = self.open[index]
+        del self.open[index:]
+
+        return (start, marker) if not self.open else None
+
+    def finish(self):
+        """Raise if any marker was left without a counterpart."""
+        unmatched = sorted(self.unmatched + self.open, key=lambda marker: marker.line)
+        if unmatched:
+            details = ", ".join(
+                f"DOC_INJECT_{marker.kind} {marker.name} on line {marker.line}"
+                for marker in unmatched
+            )
+            raise ValueError(f"Unmatched injection markers: {details}")
+
+
+def scan_blocks(content: str) -> List[Tuple[Marker, Marker]]:
+    """The outermost (start, end) marker pairs of `content`, in document order."""
+    pairer = MarkerPairer()
+    blocks = [pair for pair in map(pairer.feed, iter_markers(content)) if pair is not None]
+    pairer.finish()
+    return blocks
+
+
+def inject_from_file(
+    file_path: Path,
+    config: "InjectItem",
+    check: bool = False,
+    cache: Optional["RenderCache"] = None,
+    only: Optional[Collection[str]] = None,
+    engine: str = "text",
+) -> bool:
+    """
+    Render all injection blocks of `file_path`.
+    Returns True if the rendered output differs from the file on disk. The file
+    is only written when it changed, and never when `check` is set; writes go to
+    a temporary file that atomically replaces the original. Blocks are served
+    from `cache` when none of their inputs changed. If `only` is given, blocks
+    with other names are left as they are.
+
+    `engine` selects how the document is processed:
+    - "text": decode it, splice the blocks and write the result.
+    - "stream": scan it line by line, copying it to the temporary file as it is
+      read, so memory is bounded by the largest block rather than the document.
+      Markers must then each sit on a single line.
+    - "mmap": map it into memory, find markers in the raw bytes and copy the
+      bytes between blocks unchanged; only rendered blocks are encoded. Line
+      endings and non-UTF-8 bytes outside blocks are preserved exactly.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: '{engine}'. Expected one of: {', '.join(ENGINES)}")
+
+    render = _block_renderer(config.get_items(), cache, only)
+
+    if engine == "stream":
+        return _inject_streaming(file_path, render, check)
+    if engine == "mmap":
+        return _inject_mapped(file_path, render, check)
 
-def inject_from_file(file_path: Path, config: InjectItem):
     content = file_path.read_text(encoding="utf-8")
 
-    items = config.get_items()
+    pieces = []
+    pos = 0
+    for start, end in scan_blocks(content):
+        pieces.append(content[pos : start.end])
+        pieces.append(_replacement(render, start.name, content[start.end : end.start]))
+        pos = end.start
+    pieces.append(content[pos:])
+    result = "".join(pieces)
+
+    if result == content:
+        return False
+
+    if not check:
+        write_atomic(file_path, result)
+
+    return True
+
+
+def _block_renderer(
+    items, cache: Optional["RenderCache"], only: Optional[Collection[str]]
+) -> Callable[[str], Optional[str]]:
+    """Renders a block by name; None means the block is to be left untouched."""
 
-    def replace_block(match: re.Match) -> str:
-        name = match.group("name")
+    def render(name: str) -> Optional[str]:
+        if only is not None and name not in only:
+            return None
         if name not in items:
             raise ValueError(f"No config found for injection block: '{name}'")
 
-        item = items[name]
+        return render_item(items[name], cache)
+
+    return render
+
+
+def _replacement(render: Callable[[str], Optional[str]], name: str, old: str) -> str:
+    rendered = render(name)
+    return old if rendered is None else f"\n{rendered}\n"
+
+
+def _inject_streaming(file_path: Path, render: Callable[[str], Optional[str]], check: bool) -> bool:
+    changed = False
+    out = None if check else AtomicFile(file_path)
+    pairer = MarkerPairer()
+    block: List[str] = []
+
+    def emit(text: str):
+        if out is not None:
+            out.write(text)
+
+    def feed(chunk: str, lineno: int):
+        nonlocal changed, block
+        pos = 0
+        for marker in iter_markers(chunk, lineno):
+            inside = pairer.depth > 0
+            pair = pairer.feed(marker)
+            if pair is not None:
+                block.append(chunk[pos : marker.start])
+                old = "".join(block)
+                new = _replacement(render, marker.name, old)
+                changed = changed or new != old
+                emit(new)
+                emit(chunk[marker.start : marker.end])
+                block = []
+            elif inside:
+                block.append(chunk[pos : marker.end])
+            else:
+                emit(chunk[pos : marker.end])
+            pos = marker.end
+        if pairer.depth:
+            block.append(chunk[pos:])
+        else:
+            emit(chunk[pos:])
+
+    try:
+        with open(file_path, encoding="utf-8") as src:
+            # markers may span lines, so a line ending in one is held back until
+            # the next line shows where it ends
+            pending = ""
+            lineno = 1
+            for line in src:
+                if not pending and "DOC_INJECT_" not in line:
+                    if not line.rstrip().endswith(_MARKER_OPENERS):
+                        # no marker here, nor one that the next line could complete
+                        if pairer.depth:
+                            block.append(line)
+                        else:
+                            emit(line)
+                        lineno += 1
+                        continue
+                pending += line
+                tail = _MARKER_TAIL.search(pending)
+                cut = len(pending) if tail is None else tail.start()
+                if cut:
+                    feed(pending[:cut], lineno)
+                    lineno += pending.count("\n", 0, cut)
+                    pending = pending[cut:]
+            feed(pending, lineno)
+
+        pairer.finish()
+        if out is not None and changed:
+            out.commit()
+    finally:
+        if out is not None:
+            out.discard()
+
+    return changed
+
+
+def _inject_mapped(file_path: Path, render: Callable[[str], Optional[str]], check: bool) -> bool:
+    splices: List[Tuple[int, int, bytes]] = []
+    out = None
+    try:
+        with open(file_path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                view = memoryview(data)
+                try:
+                    pairer = MarkerPairer()
+                    newline = _newline(data)
+                    for marker in _iter_byte_markers(data):
+                        pair = pairer.feed(marker)
+                        if pair is None:
+                            continue
+                        start, end = pair
+                        rendered = render(start.name)
+                        if rendered is None:
+                            continue
+                        new = _encode_block(rendered, newline)
+                        if view[start.end : end.start] != new:
+                            splices.append((start.end, end.start, new))
+
+                    if pairer.unmatched or pairer.open:
+                        _number_lines(data, pairer)
+                    pairer.finish()
+
+                    if splices and not check:
+                        out = AtomicFile(file_path, "wb")
+                        pos = 0
+                        for block_start, block_end, new in splices:
+                            out.write(view[pos:block_start])
+                            out.write(new)
+                            pos = block_end
+                        out.write(view[pos:])
+                finally:
+                    view.release()
+
+        # the original is only replaced once it is no longer mapped
+        if out is not None:
+            out.commit()
+    finally:
+        if out is not None:
+            out.discard()
+
+    return bool(splices)
+
+
+def _iter_byte_markers(data) -> Iterator[Marker]:
+    """Markers of a bytes-like object; line numbers are filled in by `_number_lines` if needed."""
+    for match in _BYTES_MARKER_PATTERN.finditer(data):
+        kind, name = match.group("kind").decode("ascii"), match.group("name").decode("ascii")
+        yield Marker(kind, name, match.start(), match.end(), 0)
+
+
+def _number_lines(data, pairer: MarkerPairer):
+    """Set the line numbers of unmatched markers, which are only needed for the error."""
+
+    def numbered(markers: List[Marker]) -> List[Marker]:
+        return [marker._replace(line=data[: marker.start].count(b"\n") + 1) for marker in markers]
+
+    pairer.unmatched, pairer.open = numbered(pairer.unmatched), numbered(pairer.open)
+
+
+def _newline(data) -> bytes:
+    """The line ending used by the document, judged by its first line."""
+    end = data.find(b"\n")
+    return b"\r\n" if end > 0 and data[end - 1 : end] == b"\r" else b"\n"
+
+
+def _encode_block(rendered: str, newline: bytes) -> bytes:
+    block = f"\n{rendered}\n".encode("utf-8")
+    if newline == b"\n":
+        return block
+    return block.replace(b"\r\n", b"\n").replace(b"\n", newline)
+
+
+def has_markers(file_path: Path) -> bool:
+    """
+    Quick check before a target's config is loaded: False only if `file_path`
+    cannot contain an injection marker.
+    """
+    with open(file_path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return data.find(b"DOC_INJECT_") != -1
+
+
+def find_block_names(content: str) -> List[str]:
+    """Names of the injection blocks in `content`, in document order."""
+    return [start.name for start, _ in scan_blocks(content)]
+
 
-        # Resolve context and render
-        context = resolve_query(item)
-        rendered = render_template(item.template, context, strict=item.strict_template)
+def render_item(item: "InjectItem", cache: Optional["RenderCache"] = None) -> str:
+    from doc_inject.parsers.core import resolve_query
+    from doc_inject.template import render_template
 
-        return f"{match.group('start')}\n{rendered}\n{match.group('end')}"
+    key = cache.key_for(item) if cache else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
-    result = INJECT_BLOCK_PATTERN.sub(replace_block, content)
+    # Resolve context and render
+    context = resolve_query(item, values=cache.values if cache else None)
+    rendered = render_template(item.template, context, strict=item.strict_template)
 
-    file_path.write_text(result, encoding="utf-8")
+    if key:
+        cache.put(key, rendered)
+    return rendered
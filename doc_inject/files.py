@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+class AtomicFile:
+    """
+    A temporary file next to `path` that replaces it on `commit()`.
+    Readers never see a partially written file; leaving the `with` block
+    without committing (or with an exception) discards the temporary file.
+    Symlinks are followed, so the file they point to is replaced. A file with
+    several hard links is overwritten in place instead, keeping the links.
+    """
+
+    def __init__(self, path: Path, mode: str = "w", encoding: Optional[str] = "utf-8"):
+        self.path = Path(os.path.realpath(path))
+        fd, self._tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        self.file = os.fdopen(fd, mode, encoding=encoding if "b" not in mode else None)
+        self._done = False
+
+    def write(self, data):
+        return self.file.write(data)
+
+    def commit(self):
+        self.file.close()
+        try:
+            linked = os.stat(self.path).st_nlink > 1
+        except FileNotFoundError:
+            linked = False
+
+        if linked:
+            with open(self._tmp, "rb") as src, open(self.path, "r+b") as dst:
+                shutil.copyfileobj(src, dst)
+                dst.truncate()
+            os.unlink(self._tmp)
+        else:
+            if self.path.exists():
+                shutil.copymode(self.path, self._tmp)
+            os.replace(self._tmp, self.path)
+        self._done = True
+
+    def discard(self):
+        if not self._done:
+            self.file.close()
+            os.unlink(self._tmp)
+            self._done = True
+
+    def __enter__(self) -> "AtomicFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.discard()
+
+
+def write_atomic(path: Path, text: str):
+    with AtomicFile(path) as fh:
+        fh.write(text)
+        fh.commit()
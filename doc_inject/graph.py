@@ -0,0 +1,162 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from doc_inject.config import InjectConfig
+from doc_inject.config_loader import ExternalConfig, load_target_config
+from doc_inject.engine import find_block_names
+from doc_inject.walker import walked_dirs
+
+Block = Tuple[Path, str]
+
+
+class DependencyGraph:
+    """
+    Maps source files and globbed directories to the target blocks that use them.
+    Only blocks whose markers appear in a target are tracked.
+    """
+
+    def __init__(self, external: Optional[ExternalConfig] = None):
+        self.external = external
+        self.configs: Dict[Path, InjectConfig] = {}
+        self.blocks: Dict[Path, List[str]] = {}
+        self.sources: Dict[str, Set[Block]] = {}
+        self.glob_roots: Dict[str, Set[Block]] = {}
+        self.globbed_dirs: Dict[str, Set[Block]] = {}
+
+    def add_target(self, target: Path):
+        """(Re-)load the config of `target` and record the dependencies of its blocks."""
+        self.remove_target(target)
+
+        config = load_target_config(target, self.external)
+        names = find_block_names(target.read_text(encoding="utf-8"))
+        items = config.get_items()
+
+        self.configs[target] = config
+        self.blocks[target] = names
+        for name in names:
+            if name in items:
+                self._add_item_dependencies(target, name)
+
+    def remove_target(self, target: Path):
+        self.configs.pop(target, None)
+        self.blocks.pop(target, None)
+        for edges in (self.sources, self.glob_roots, self.globbed_dirs):
+            for key in list(edges):
+                edges[key] = {block for block in edges[key] if block[0] != target}
+                if not edges[key]:
+                    del edges[key]
+
+    def refresh_block(self, block: Block):
+        """Re-resolve the sources of a glob block after files were created or deleted."""
+        target, name = block
+        self.configs[target].get_items()[name].reset_resolved_files()
+        for edges in (*self.sources.values(), *self.globbed_dirs.values()):
+            edges.discard(block)
+        self._add_item_dependencies(target, name)
+
+    def sources_of(self, target: Path) -> List[str]:
+        return sorted(path for path, blocks in self.sources.items() if _targets(blocks, target))
+
+    def glob_roots_of(self, target: Path) -> List[str]:
+        return sorted(path for path, blocks in self.glob_roots.items() if _targets(blocks, target))
+
+    def globbed_dirs_of(self, target: Path) -> List[str]:
+        """Directories whose listing a target's globs depend on: each root and every
+        directory walked below it."""
+        return sorted(
+            path for path, blocks in self.globbed_dirs.items() if _targets(blocks, target)
+        )
+
+    def affected_by(self, path: str) -> Set[Block]:
+        return set(self.sources.get(path, ()))
+
+    def globbed_by(self, path: str) -> Set[Block]:
+        """Glob blocks whose roots contain `path`."""
+        blocks: Set[Block] = set()
+        for root, edges in self.glob_roots.items():
+            if is_within(path, root):
+                blocks |= edges
+        return blocks
+
+    def _add_item_dependencies(self, target: Path, name: str):
+        item = self.configs[target].get_items()[name]
+        block = (target, name)
+        for path in item._resolved_files:
+            self.sources.setdefault(_key(path), set()).add(block)
+        for root in item.glob_roots():
+            self.glob_roots.setdefault(_key(root), set()).add(block)
+        if item.glob:
+            for directory in walked_dirs(*item.glob_patterns()):
+                self.globbed_dirs.setdefault(_key(directory), set()).add(block)
+
+
+def dependencies(graph: DependencyGraph, config_path: Optional[Path] = None) -> Dict[str, dict]:
+    """Per target: the source files and globbed directories it depends on."""
+    config = _display(os.path.realpath(config_path)) if config_path else None
+    return {
+        target.as_posix(): {
+            "config": config,
+            "sources": [_display(path) for path in graph.sources_of(target)],
+            "directories": [_display(path) for path in graph.globbed_dirs_of(target)],
+        }
+        for target in graph.configs
+    }
+
+
+def format_json(deps: Dict[str, dict]) -> str:
+    return json.dumps(deps, indent=2) + "\n"
+
+
+def format_make(deps: Dict[str, dict]) -> str:
+    """Makefile depfile; sources also get empty rules so deleting one does not break make."""
+    lines = []
+    phony = set()
+    for target, entry in deps.items():
+        paths = _dependency_paths(entry)
+        lines.append(f"{_make_escape(target)}: {' '.join(map(_make_escape, paths))}".rstrip())
+        phony.update(entry["sources"])
+    lines.extend(f"{_make_escape(path)}:" for path in sorted(phony))
+    return "\n".join(lines) + "\n"
+
+
+def format_ninja(deps: Dict[str, dict]) -> str:
+    """Ninja depfile syntax: one `target: deps` line per target."""
+    lines = []
+    for target, entry in deps.items():
+        paths = _dependency_paths(entry)
+        lines.append(f"{_ninja_escape(target)}: {' '.join(map(_ninja_escape, paths))}".rstrip())
+    return "\n".join(lines) + "\n"
+
+
+def _dependency_paths(entry: dict) -> List[str]:
+    paths = [entry["config"]] if entry["config"] else []
+    return paths + entry["sources"] + entry["directories"]
+
+
+def _make_escape(path: str) -> str:
+    return path.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+
+def _ninja_escape(path: str) -> str:
+    return path.replace("$", "$$").replace(" ", "\\ ")
+
+
+def _display(path: str) -> str:
+    """Paths below the working directory are shown relative to it."""
+    relative = os.path.relpath(path)
+    return path if relative.startswith("..") else Path(relative).as_posix()
+
+
+def is_within(path: str, root: str) -> bool:
+    """Whether `path` is `root` or lies below it."""
+    return path == root or path.startswith(root.rstrip("/") + "/")
+
+
+def _key(path: Path) -> str:
+    return os.path.realpath(path)
+
+
+def _targets(blocks: Set[Block], target: Path) -> bool:
+    return any(block[0] == target for block in blocks)
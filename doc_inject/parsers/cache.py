@@ -0,0 +1,87 @@
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SourceCache:
+    """
+    Parsed source files keyed by real path and parser.
+    Entries are invalidated when the file's mtime or size changes and evicted
+    least-recently-used once the summed source size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], int, Any]]" = (
+            OrderedDict()
+        )
+
+    def load(self, path: Path, parser: str, loader: Callable[[bytes], Any]) -> Any:
+        real = os.path.realpath(path)
+        stat = os.stat(real)
+        key = (real, parser)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+        self.misses += 1
+        with open(real, "rb") as fh:
+            data = loader(fh.read())
+
+        self._discard(key)
+        if stat.st_size <= self.max_bytes:
+            self._entries[key] = (stamp, stat.st_size, data)
+            self._size += stat.st_size
+            while self._size > self.max_bytes:
+                _, (_, size, _) = self._entries.popitem(last=False)
+                self._size -= size
+
+        return data
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+    def _discard(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+
+_SOURCE_CACHE = SourceCache(int(os.getenv("DOC_INJECT_SOURCE_CACHE_BYTES", DEFAULT_MAX_BYTES)))
+
+
+def load_source(path: Path, parser: str, loader: Callable[[bytes], Any]) -> Any:
+    """
+    Read and parse `path` at most once per run (until it changes on disk).
+    `loader` receives the raw file bytes and returns the parsed data.
+    """
+    return _SOURCE_CACHE.load(path, parser, loader)
+
+
+def clear_source_cache():
+    _SOURCE_CACHE.clear()
+
+
+def source_cache_info() -> Dict[str, int]:
+    return _SOURCE_CACHE.info()
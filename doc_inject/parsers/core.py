@@ -1,28 +1,29 @@
-import json
-import sys
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import yaml
-from jsonpath_ng import parse as jp_parse
+from doc_inject.parsers.cache import load_source
 
-from doc_inject.config import InjectItem
-from doc_inject.parsers.json import parse_json
-from doc_inject.parsers.text import parse_text
-from doc_inject.parsers.toml import parse_toml
-from doc_inject.parsers.yaml import parse_yaml
+# Parser modules are imported on first use, so a run only pays for the
+# formats its sources are in.
+if TYPE_CHECKING:
+    from doc_inject.config import InjectItem
+    from doc_inject.render_cache import ValueStore
 
-# Use tomllib if available (Python 3.11+), fallback to tomli
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib
 
-
-def resolve_query(item: InjectItem) -> Dict[str, Any]:
+def resolve_query(item: "InjectItem", values: Optional["ValueStore"] = None) -> Dict[str, Any]:
+    """
+    Build the template context of `item`. With a `values` store, glob queries only
+    re-parse sources that changed since the store last saw them.
+    """
     result = []
 
-    if item.vars:
+    if item.vars and item.parser == "text":
+        from doc_inject.parsers.text import parse_text_queries
+
+        # all vars of a file are resolved in one pass over it
+        result.append([parse_text_queries(file, item.vars) for file in item._resolved_files])
+
+    elif item.vars:
         result.extend(
             [
                 _query(item._resolved_files, q, parser=item.parser, assign_to=name)
@@ -32,8 +33,21 @@ def resolve_query(item: InjectItem) -> Dict[str, Any]:
 
     elif item.query:
         if item.parser == "text":
+            from doc_inject.parsers.text import parse_text
+
             result.append([parse_text(file, item.query) for file in item._resolved_files])
 
+        elif item.glob and values is not None:
+            return {
+                "value": values.query(
+                    item._resolved_files,
+                    item.parser,
+                    item.query,
+                    lambda path: _parse_one(path, item.query, item.parser),
+                    scope=item.glob_patterns(),
+                )
+            }
+
         else:
             result.append(
                 _query(item._resolved_files, item.query, parser=item.parser, assign_to="value")
@@ -48,51 +62,47 @@ def resolve_query(item: InjectItem) -> Dict[str, Any]:
 
 
 def _load_file(path: Path, parser: str):
-    content = path.read_text(encoding="utf-8")
+    if parser == "text":
+        return None
 
+    return load_source(path, parser, lambda raw: _loads(raw, parser))
+
+
+def _loads(raw: bytes, parser: str):
     if parser == "json":
-        return json.loads(content)
+        from doc_inject.parsers.json import loads_json
+
+        return loads_json(raw)
 
     elif parser == "yaml":
-        return yaml.safe_load(content)
+        from doc_inject.parsers.yaml import load_yaml
+
+        return load_yaml(raw)
 
     elif parser == "toml":
-        return tomllib.loads(content)
+        from doc_inject.parsers.toml import load_toml
 
-    elif parser == "text":
-        return None
+        return load_toml(raw)
 
     raise ValueError(f"Unsupported parser: {parser}")
 
 
 def _query(paths: list[Path], expression: str, parser: str, assign_to: str = "value") -> Any:
-    result = []
-    if parser == "json":
-        result = [parse_json(path, expression) for path in paths]
-    elif parser == "yaml":
-        result = [parse_yaml(path, expression) for path in paths]
-    elif parser == "toml":
-        result = [parse_toml(path, expression) for path in paths]
-    else:
-        raise ValueError(f"Unsupported parser: {parser}")
+    return [{assign_to: _parse_one(path, expression, parser)} for path in paths]
+
 
-    return [{assign_to: x} for x in result]
+def _parse_one(path: Path, expression: str, parser: str) -> Any:
+    if parser == "json":
+        from doc_inject.parsers.json import parse_json
 
+        return parse_json(path, expression)
+    elif parser == "yaml":
+        from doc_inject.parsers.yaml import parse_yaml
 
-def _jsonpath_query(data: Any, expr: str) -> Any:
-    matches = jp_parse(expr).find(data)
-    if not matches:
-        raise ValueError(f"No match found for JSONPath query: {expr}")
-    if len(matches) == 1:
-        return matches[0].value
-    return [match.value for match in matches]
+        return parse_yaml(path, expression)
+    elif parser == "toml":
+        from doc_inject.parsers.toml import parse_toml
 
+        return parse_toml(path, expression)
 
-def _dotted_path_query(data: Any, path: str) -> Any:
-    parts = path.split(".")
-    for key in parts:
-        if isinstance(data, dict) and key in data:
-            data = data[key]
-        else:
-            raise ValueError(f"Key '{key}' not found while traversing: {path}")
-    return data
+    raise ValueError(f"Unsupported parser: {parser}")
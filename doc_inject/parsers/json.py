@@ -1,31 +1,183 @@
+import importlib
 import json
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Optional, Tuple, Union
 
-import json5
-from jsonpath_ng import parse as jp_parse
+from doc_inject.parsers.cache import load_source
+from doc_inject.parsers.json_stream import StreamUnsupported, is_streamable, stream_query
+from doc_inject.parsers.query import compile_accessor, jsonpath_query
+
+BACKEND_ENV = "DOC_INJECT_JSON_BACKEND"
+
+# In order of preference for "auto"; stdlib json is always available.
+JSON_BACKENDS = ("orjson", "ujson", "json")
+
+_override: Optional[str] = None
+
+# Sources at least this large are queried by streaming when the expression allows it.
+STREAM_ENV = "DOC_INJECT_JSON_STREAM_BYTES"
+DEFAULT_STREAM_BYTES = 64 * 1024 * 1024
+
+# Common JSON5 syntax, rewritten to JSON by `normalize_json5` in a single pass.
+_JSON5_TOKEN = re.compile(
+    r"""
+      (?P<string>"(?:[^"\\\n]|\\[\s\S])*")
+    | (?P<single>'(?:[^'\\\n]|\\[\s\S])*')
+    | (?P<comment>//[^\n]*|/\*[\s\S]*?\*/)
+    | (?P<trailing>,(?:\s|//[^\n]*|/\*[\s\S]*?\*/)*(?=[}\]]))
+    | (?P<key>(?<![\w$])[A-Za-z_$][\w$]*(?=\s*:))
+    """,
+    re.VERBOSE,
+)
+_SINGLE_QUOTED_ESCAPE = re.compile(r'\\[\s\S]|"')
+
+# Integers outside int64 are turned into floats or rejected by orjson and ujson.
+# Documents with a run of 19 digits are left to stdlib json; the run is found by
+# mapping digits to "0" and everything else to " " (much faster than a regex).
+_DIGITS_ONLY = bytes(ord("0") if b in b"0123456789" else ord(" ") for b in range(256))
+_LONG_DIGITS = b"0" * 19
+
+
+def set_json_backend(name: Optional[str]):
+    """Select the JSON backend of this process; None defers to the environment."""
+    if name is not None:
+        _backend(name)
+    global _override
+    _override = name
+
+
+def json_backend() -> str:
+    """Name of the JSON backend in use."""
+    return _active()[1]
+
+
+def loads_json(raw: Union[bytes, str]) -> Any:
+    """
+    Parse JSON from raw bytes with the selected backend. Documents with
+    possibly out-of-int64 integers, or that the backend rejects, are parsed by
+    stdlib json, so every backend gives the same result as `json.loads`.
+    """
+    loads, name = _active()
+    if name != "json":
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        if _LONG_DIGITS not in raw.translate(_DIGITS_ONLY):
+            try:
+                return loads(raw)
+            except ValueError:
+                pass
+    return json.loads(raw)
+
+
+def loads_json5(raw: bytes) -> Any:
+    """
+    Parse JSON5. Comments, trailing commas, unquoted keys and single-quoted
+    strings are rewritten to JSON for the JSON backend; anything else goes to
+    the (much slower) json5 library.
+    """
+    content = raw.decode("utf-8")
+    try:
+        return loads_json(normalize_json5(content))
+    except ValueError:
+        import json5
+
+        return json5.loads(content)
+
+
+def normalize_json5(content: str) -> str:
+    """Rewrite common JSON5 syntax to JSON in one linear pass."""
+    return _JSON5_TOKEN.sub(_normalize_token, content)
 
 
 def parse_json(path: Path, query: str) -> Any:
     """
     Load JSON or JSON5 from file and apply a JSONPath query.
+    Large files queried by plain keys and indices are streamed instead of loaded.
     """
-    content = path.read_text(encoding="utf-8")
+    accessor = compile_accessor(query)
+    if accessor is not None and _should_stream(path, accessor.steps):
+        try:
+            matches = stream_query(path, accessor.steps, loads_json)
+        except StreamUnsupported:
+            pass
+        else:
+            if not matches:
+                raise ValueError(f"No match found for JSONPath query: {query}")
+            return matches[0]
+
+    data = load_source(path, "json", lambda raw: _load_json(path, raw))
+
+    return jsonpath_query(data, query)
+
+
+def _should_stream(path: Path, steps) -> bool:
+    if path.suffix.lower() == ".json5" or not is_streamable(steps):
+        return False
+    threshold = int(os.environ.get(STREAM_ENV, DEFAULT_STREAM_BYTES))
+    return os.stat(path).st_size >= threshold
+
+
+def _load_json(path: Path, raw: bytes) -> Any:
+    # .json5 files skip the strict attempt; other files are tried as strict JSON first
+    if path.suffix.lower() == ".json5":
+        return _load_json5(path, raw)
 
     try:
-        data = json.loads(content)
-    except json.JSONDecodeError:
-        try:
-            data = json5.loads(content)
-        except Exception as e:
-            raise ValueError(f"Failed to parse {path} as JSON or JSON5: {e}")
+        return loads_json(raw)
+    except ValueError:
+        return _load_json5(path, raw)
 
-    matches = jp_parse(query).find(data)
 
-    if not matches:
-        raise ValueError(f"No match found for JSONPath query: {query}")
+def _load_json5(path: Path, raw: bytes) -> Any:
+    try:
+        return loads_json5(raw)
+    except Exception as e:
+        raise ValueError(f"Failed to parse {path} as JSON or JSON5: {e}")
+
+
+def _normalize_token(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == "string":
+        return match.group(0)
+    if kind == "single":
+        return '"' + _SINGLE_QUOTED_ESCAPE.sub(_double_quote_escape, match.group(0)[1:-1]) + '"'
+    if kind == "key":
+        return f'"{match.group(0)}"'
+    # comments and trailing commas
+    return " " if kind == "comment" else ""
+
+
+def _double_quote_escape(match: re.Match) -> str:
+    text = match.group(0)
+    if text == '"':
+        return '\\"'
+    return "'" if text == "\\'" else text
 
-    if len(matches) == 1:
-        return matches[0].value
 
-    return [match.value for match in matches]
+def _active() -> Tuple[Callable[[bytes], Any], str]:
+    return _backend(_override or os.environ.get(BACKEND_ENV) or "auto")
+
+
+@lru_cache(maxsize=None)
+def _backend(name: str) -> Tuple[Callable[[bytes], Any], str]:
+    if name == "auto":
+        for candidate in JSON_BACKENDS:
+            try:
+                return _backend(candidate)
+            except ValueError:
+                continue
+
+    if name not in JSON_BACKENDS:
+        expected = ", ".join(("auto",) + JSON_BACKENDS)
+        raise ValueError(f"Unknown JSON backend: '{name}'. Expected one of: {expected}")
+    if name == "json":
+        return json.loads, "json"
+
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    return module.loads, name
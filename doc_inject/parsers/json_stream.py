@@ -0,0 +1,175 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, List, Optional
+
+from doc_inject.parsers.query import INDEX, KEY, Step
+
+CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR = re.compile(rb"[^,\]}\s]*")
+# Everything up to the next bracket, skipping over complete strings.
+_RUN = re.compile(rb'(?:[^"\[\]{}]+|"(?:[^"\\]|\\.)*")*', re.DOTALL)
+
+_QUOTE, _COLON, _COMMA = ord('"'), ord(":"), ord(",")
+_LBRACE, _RBRACE, _LBRACKET, _RBRACKET = ord("{"), ord("}"), ord("["), ord("]")
+
+
+class StreamUnsupported(Exception):
+    """The document cannot be queried while streaming; load it fully instead."""
+
+
+def is_streamable(steps: List[Step]) -> bool:
+    """Whether a compiled JSONPath selects at most one value by keys and indices."""
+    return bool(steps) and all(kind in (KEY, INDEX) for kind, _ in steps)
+
+
+def stream_query(
+    path: Path, steps: List[Step], loads: Callable[[bytes], Any], chunk_size: int = CHUNK_SIZE
+) -> List[Any]:
+    """
+    Resolve key/index `steps` in a JSON file without loading all of it.
+
+    The file is tokenized incrementally; values before the match are skipped
+    without being decoded, only the selected subtree is materialized (with
+    `loads`), and nothing after it is read. Returns the match, or an empty
+    list. Of duplicated keys, the first one wins.
+    """
+    with open(path, "rb") as fh:
+        reader = _Reader(fh, chunk_size)
+        for kind, arg in steps:
+            found = reader.enter_key(arg) if kind == KEY else reader.enter_index(arg)
+            if not found:
+                return []
+        raw = reader.capture_value()
+
+    try:
+        return [loads(raw)]
+    except ValueError as e:
+        raise StreamUnsupported(str(e))
+
+
+class _Reader:
+    def __init__(self, fh: BinaryIO, chunk_size: int):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self.buf = fh.read(chunk_size)
+        self.pos = 3 if self.buf.startswith(b"\xef\xbb\xbf") else 0
+        self._captured: Optional[List[bytes]] = None
+        self._mark = 0
+
+    def enter_key(self, key: str) -> bool:
+        """Move to the value of `key` in the current object."""
+        if self.peek() != _LBRACE:
+            return False
+        self.pos += 1
+        if self.peek() == _RBRACE:
+            return False
+
+        while True:
+            if self.peek() != _QUOTE:
+                raise StreamUnsupported("expected a quoted key")
+            name = self.read_string()
+            self.expect(_COLON)
+            if name == key:
+                return True
+            self.skip_value()
+            if not self.next_item(_RBRACE):
+                return False
+
+    def enter_index(self, index: int) -> bool:
+        """Move to element `index` of the current array."""
+        char = self.peek()
+        if char == _LBRACE:
+            return False
+        if char != _LBRACKET:
+            raise StreamUnsupported("index into a scalar")
+        self.pos += 1
+        if self.peek() == _RBRACKET:
+            return False
+
+        for _ in range(index):
+            self.skip_value()
+            if not self.next_item(_RBRACKET):
+                return False
+        return True
+
+    def next_item(self, closing: int) -> bool:
+        """Consume the separator after a value; False at the end of the container."""
+        char = self.peek()
+        self.pos += 1
+        if char == closing:
+            return False
+        if char != _COMMA:
+            raise StreamUnsupported(f"unexpected {chr(char)!r}")
+        return True
+
+    def capture_value(self) -> bytes:
+        self.peek()
+        self._captured, self._mark = [], self.pos
+        self.skip_value()
+        pieces = self._captured + [self.buf[self._mark : self.pos]]
+        self._captured = None
+        return b"".join(pieces)
+
+    def skip_value(self):
+        char = self.peek()
+        if char == _QUOTE:
+            self.pos = self._match(_STRING).end()
+            return
+        if char not in (_LBRACE, _LBRACKET):
+            self.pos = self._match(_SCALAR).end()
+            return
+
+        depth = 0
+        while True:
+            self.pos = _RUN.match(self.buf, self.pos).end()
+            if self.pos == len(self.buf) or self.buf[self.pos] == _QUOTE:
+                # a string or the document continues past the buffer
+                self._fill()
+                continue
+            char = self.buf[self.pos]
+            self.pos += 1
+            depth += 1 if char in (_LBRACE, _LBRACKET) else -1
+            if depth == 0:
+                return
+
+    def read_string(self) -> str:
+        match = self._match(_STRING)
+        self.pos = match.end()
+        try:
+            return json.loads(match.group(0))
+        except ValueError as e:
+            raise StreamUnsupported(str(e))
+
+    def expect(self, byte: int):
+        if self.peek() != byte:
+            raise StreamUnsupported(f"expected {chr(byte)!r}")
+        self.pos += 1
+
+    def peek(self) -> int:
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self._fill()
+
+    def _match(self, pattern: "re.Pattern[bytes]") -> "re.Match[bytes]":
+        """Match `pattern` at the current position, reading on until the match is complete."""
+        while True:
+            match = pattern.match(self.buf, self.pos)
+            if match and match.end() < len(self.buf):
+                return match
+            self._fill()
+
+    def _fill(self):
+        data = self._fh.read(self._chunk_size)
+        if not data:
+            raise StreamUnsupported("unexpected end of document")
+        if self._captured is not None:
+            self._captured.append(self.buf[self._mark : self.pos])
+            self._mark = 0
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
@@ -0,0 +1,149 @@
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from jsonpath_ng import JSONPath
+
+KEY, INDEX, WILDCARD, VALUES = "key", "index", "wildcard", "values"
+
+Step = Tuple[str, Any]
+
+# The subset of JSONPath the fast path understands: `$`, `.name`, `['name']`,
+# `[0]`, `[*]` and `.*`. Anything else (filters, slices, `..`) uses jsonpath_ng.
+_JSONPATH_STEP = re.compile(
+    r"""
+      \.(?P<name>[A-Za-z_][\w\-]*)
+    | \[(?P<quote>['"])(?P<quoted>[^'"\\]*)(?P=quote)\]
+    | \[(?P<index>\d+)\]
+    | (?P<wildcard>\[\*\])
+    | (?P<values>\.\*)
+    """,
+    re.VERBOSE,
+)
+
+_RESERVED_NAMES = {"where", "wherenot"}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class Accessor:
+    """
+    Plain Python lookups compiled from a JSONPath or dotted path expression.
+    """
+
+    def __init__(self, expression: str, steps: List[Step]):
+        self.expression = expression
+        self.steps = steps
+
+    def find(self, data: Any) -> List[Any]:
+        """Return all values matched by the expression, mirroring jsonpath_ng."""
+        current = [data]
+        for kind, arg in self.steps:
+            found = []
+            for value in current:
+                if kind == KEY:
+                    if isinstance(value, dict) and arg in value:
+                        found.append(value[arg])
+                elif kind == INDEX:
+                    if isinstance(value, list):
+                        if arg < len(value):
+                            found.append(value[arg])
+                    elif value is not None and not isinstance(value, dict):
+                        raise _Unsupported(self.expression)
+                elif kind == WILDCARD:
+                    if isinstance(value, list):
+                        found.extend(value)
+                    elif value is not None:
+                        found.append(value)
+                elif isinstance(value, dict):
+                    found.extend(value.values())
+            current = found
+        return current
+
+    def get(self, data: Any) -> Any:
+        """Resolve a dotted key path, raising if any key is missing."""
+        for _, key in self.steps:
+            if isinstance(data, dict) and key in data:
+                data = data[key]
+            else:
+                raise ValueError(f"Key '{key}' not found while traversing: {self.expression}")
+        return data
+
+
+@lru_cache(maxsize=1024)
+def compile_jsonpath(expression: str) -> "JSONPath":
+    """Compile a JSONPath expression once per process; jsonpath_ng is imported on first use."""
+    from jsonpath_ng import parse as jp_parse
+
+    return jp_parse(expression)
+
+
+def jsonpath_cache_info() -> Dict[str, int]:
+    info = compile_jsonpath.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+@lru_cache(maxsize=1024)
+def compile_accessor(expression: str) -> Optional[Accessor]:
+    """Compile a simple JSONPath expression, or return None if it needs jsonpath_ng."""
+    if not expression.startswith("$"):
+        return None
+
+    steps: List[Step] = []
+    pos = 1
+    while pos < len(expression):
+        match = _JSONPATH_STEP.match(expression, pos)
+        if not match:
+            return None
+        if match.group("name") is not None:
+            if match.group("name") in _RESERVED_NAMES:
+                return None
+            steps.append((KEY, match.group("name")))
+        elif match.group("quote") is not None:
+            steps.append((KEY, match.group("quoted")))
+        elif match.group("index") is not None:
+            steps.append((INDEX, int(match.group("index"))))
+        elif match.group("wildcard") is not None:
+            steps.append((WILDCARD, None))
+        else:
+            steps.append((VALUES, None))
+        pos = match.end()
+
+    return Accessor(expression, steps)
+
+
+@lru_cache(maxsize=1024)
+def compile_dotted(path: str) -> Accessor:
+    return Accessor(path, [(KEY, key) for key in path.split(".")])
+
+
+def find_jsonpath(data: Any, expression: str) -> List[Any]:
+    accessor = compile_accessor(expression)
+    if accessor is not None:
+        try:
+            return accessor.find(data)
+        except _Unsupported:
+            pass
+    return [match.value for match in compile_jsonpath(expression).find(data)]
+
+
+def jsonpath_query(data: Any, expression: str) -> Any:
+    """
+    Apply a JSONPath query: a single match yields its value, several yield a list.
+    """
+    matches = find_jsonpath(data, expression)
+
+    if not matches:
+        raise ValueError(f"No match found for JSONPath query: {expression}")
+
+    if len(matches) == 1:
+        return matches[0]
+
+    return matches
+
+
+def resolve_dotted_path(data: Any, path: str) -> Any:
+    return compile_dotted(path).get(data)
@@ -1,50 +1,284 @@
+import hashlib
+import itertools
+import mmap
+import os
 import re
+import struct
+from array import array
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
 
+from doc_inject.files import AtomicFile
+from doc_inject.parsers.cache import load_source
 
-def parse_text(path: Path, query: str) -> Dict[str, Any]:
-    lines = path.read_text(encoding="utf-8").splitlines()
+# Patterns using these behave differently on bytes than on str.
+_UNICODE_SENSITIVE = re.compile(r"\\[wWbBdDsS]|\(\?[a-zA-Z]*i")
+# Line breaks other than "\n" that `str.splitlines` would normalise.
+_OTHER_LINE_BREAKS = re.compile(rb"[\r\x0b\x0c\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+# Bytes that make a bytes search differ from a text search: non-ASCII bytes
+# (`.` or `[^…]` match one byte rather than one character) and line breaks.
+_NOT_PLAIN_ASCII = re.compile(rb"[\r\x0b\x0c\x1c-\x1e\x80-\xff]")
+_NEWLINE = re.compile(rb"\n")
 
-    if query.startswith("regex:"):
-        pattern = query[len("regex:") :]
-        return _match_regex(lines, pattern)
+# Non-negative slices ending within this many lines are read from the head of
+# the file; other slices use a line-offset index.
+HEAD_LINES = 10000
 
-    elif query.startswith("slice:"):
-        try:
-            range_str = query[len("slice:") :]
-            start_str, end_str = range_str.split(":")
-            start, end = int(start_str), int(end_str)
-        except Exception:
-            raise ValueError(f"Invalid slice syntax in query: '{query}'")
+# Line-offset indexes: byte offset of every line start plus the file size,
+# keyed by real path and validated by (mtime_ns, size).
+_INDEXES: Dict[str, Tuple[Tuple[int, int], Optional[array]]] = {}
+_INDEX_HEADER = struct.Struct("<QQ")
+_index_directory: Optional[Path] = None
+
+
+def set_line_index_directory(directory: Optional[Path]):
+    """Persist line-offset indexes below `directory`; None keeps them in memory only."""
+    global _index_directory
+    _index_directory = Path(directory) if directory is not None else None
 
-        sliced = lines[start:end]
-        return {"value": "\n".join(sliced)}
 
-    else:
-        raise ValueError(f"Unsupported text query: '{query}'")
+def parse_text(path: Path, query: str) -> Dict[str, Any]:
+    return _parse_queries(path, {"value": query})["value"]
 
 
-def _match_regex(lines: list[str], pattern: str) -> Dict[str, str]:
-    """Match named groups from the first matching regex.
+def parse_text_queries(path: Path, queries: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Resolve several queries against one text file, keyed like `queries`.
 
-    - If the pattern uses inline flags (e.g. (?m), (?s), (?x)), it is applied to the whole file.
-    - Otherwise, it is applied line-by-line.
+    Line-mode regexes are searched in a single pass over the lines and
+    whole-file regexes over one shared buffer. A match with named groups
+    resolves to their dict, any other match or slice to its text.
     """
-    compiled = re.compile(pattern)
+    return {name: _unwrap(groups) for name, groups in _parse_queries(path, queries).items()}
+
+
+def _parse_queries(path: Path, queries: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    per_line: Dict[str, str] = {}
+    whole_file: Dict[str, str] = {}
 
-    # Heuristic: If the pattern starts with inline flags, apply to whole file
-    if pattern.lstrip().startswith("(?"):
-        text = "\n".join(lines)
-        match = compiled.search(text)
-        if match:
-            groups = match.groupdict()
-            return groups if groups else {"value": match.group(0)}
-    else:
-        for line in lines:
+    for name, query in queries.items():
+        if query.startswith("regex:"):
+            pattern = query[len("regex:") :]
+            # Heuristic: If the pattern starts with inline flags, apply to whole file
+            if pattern.lstrip().startswith("(?"):
+                whole_file[name] = pattern
+            else:
+                per_line[name] = pattern
+
+        elif query.startswith("slice:"):
+            try:
+                range_str = query[len("slice:") :]
+                start_str, end_str = range_str.split(":")
+                start, end = int(start_str), int(end_str)
+            except Exception:
+                raise ValueError(f"Invalid slice syntax in query: '{query}'")
+
+            results[name] = {"value": _slice_lines(path, start, end)}
+
+        else:
+            raise ValueError(f"Unsupported text query: '{query}'")
+
+    if per_line:
+        results.update(_search_lines(path, per_line))
+    if whole_file:
+        results.update(_search_file(path, whole_file))
+    return {name: results[name] for name in queries}
+
+
+def _search_lines(path: Path, patterns: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """First match of each pattern, applied line-by-line in one pass over the file."""
+    pending = {name: _compile(pattern) for name, pattern in patterns.items()}
+    found = {}
+    for line in _iter_lines(path):
+        for name, compiled in list(pending.items()):
             match = compiled.search(line)
             if match:
-                groups = match.groupdict()
-                return groups if groups else {"value": match.group(0)}
+                found[name] = _groups(match)
+                del pending[name]
+        if not pending:
+            return found
+
+    missing = next(iter(pending))
+    raise ValueError(f"No match found for regex pattern: {patterns[missing]}")
+
+
+def _search_file(path: Path, patterns: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    First match of each pattern in the whole file. In plain ASCII files with
+    "\\n" line breaks, patterns that match bytes as they would match text search
+    the memory-mapped file; everything else shares one decoded copy of it.
+    """
+    found = {}
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            mappable: Optional[bool] = None
+            text: Optional[str] = None
+            end = 0
+            for name, pattern in patterns.items():
+                groups = None
+                if size and _bytes_compatible(pattern):
+                    if mappable is None:
+                        mappable = not _NOT_PLAIN_ASCII.search(data)
+                    if mappable:
+                        groups = _search_mapped(data, pattern)
+
+                if groups is None:
+                    if text is None:
+                        text, end = _searchable_text(data, plain=bool(mappable))
+                    match = _compile(pattern).search(text, 0, end)
+                    if not match:
+                        raise ValueError(f"No match found for regex pattern: {pattern}")
+                    groups = _groups(match)
+                found[name] = groups
+        finally:
+            if size:
+                data.close()
+    return found
+
+
+def _searchable_text(data, plain: bool = False) -> Tuple[str, int]:
+    """
+    The file as text, with its line breaks normalised to "\n" and without a final
+    one, given as the decoded text and the end to search up to. Only files with
+    other line breaks (never `plain` ones) are split into lines and joined again.
+    """
+    text = str(data, "utf-8")
+    if not plain and _OTHER_LINE_BREAKS.search(data):
+        text = "\n".join(text.splitlines())
+        return text, len(text)
+    return text, len(text) - 1 if text.endswith("\n") else len(text)
+
+
+def _bytes_compatible(pattern: str) -> bool:
+    return pattern.isascii() and not _UNICODE_SENSITIVE.search(pattern)
+
+
+def _search_mapped(data: mmap.mmap, pattern: str) -> Optional[Dict[str, str]]:
+    """
+    Search a memory-mapped plain ASCII file with a bytes version of `pattern`.
+    Returns None if the pattern does not compile as bytes; raises if there is
+    no match.
+    """
+    try:
+        compiled = _compile(pattern.encode("ascii"))
+    except re.error:
+        return None
+
+    # the decoded text is joined from its lines, without a final newline
+    end = len(data) - 1 if data[-1:] == b"\n" else len(data)
+    match = compiled.search(data, 0, end)
+    if match is None:
+        raise ValueError(f"No match found for regex pattern: {pattern}")
+    return _groups(match, decode=True)
+
+
+@lru_cache(maxsize=1024)
+def _compile(pattern: Union[str, bytes]) -> "re.Pattern":
+    return re.compile(pattern)
+
+
+def _slice_lines(path: Path, start: int, end: int) -> str:
+    """`"\\n".join(lines[start:end])` over the lines of `path`, without splitting all of it."""
+    if 0 <= start and 0 <= end <= HEAD_LINES:
+        return "\n".join(itertools.islice(_iter_lines(path), start, end))
+
+    offsets = _line_index(path)
+    if offsets is None:
+        lines = load_source(path, "text", lambda raw: raw.decode("utf-8").splitlines())
+        return "\n".join(lines[start:end])
+
+    selected = range(len(offsets) - 1)[start:end]
+    if not selected:
+        return ""
+    with open(path, "rb") as fh:
+        fh.seek(offsets[selected.start])
+        raw = fh.read(offsets[selected.stop] - offsets[selected.start])
+    return (raw[:-1] if raw.endswith(b"\n") else raw).decode("utf-8")
+
+
+def _line_index(path: Path) -> Optional[array]:
+    """
+    Line-offset index of `path`, from memory, the index directory or one pass
+    over the file. None if the file has line breaks other than "\\n".
+    """
+    real = os.path.realpath(path)
+    stat = os.stat(real)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _INDEXES.get(real)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    stored = _index_file(real)
+    offsets = _read_index(stored, stamp) if stored else None
+    if offsets is None:
+        offsets = _build_index(real)
+        if offsets is not None and stored:
+            _write_index(stored, stamp, offsets)
+
+    _INDEXES[real] = (stamp, offsets)
+    return offsets
+
+
+def _build_index(path: str) -> Optional[array]:
+    offsets = array("Q", [0])
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return offsets
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if _OTHER_LINE_BREAKS.search(data):
+                return None
+            offsets.extend(match.end() for match in _NEWLINE.finditer(data))
+    if offsets[-1] != size:
+        offsets.append(size)
+    return offsets
+
+
+def _index_file(path: str) -> Optional[Path]:
+    if _index_directory is None:
+        return None
+    return _index_directory / hashlib.sha256(path.encode("utf-8")).hexdigest()
+
+
+def _read_index(index_file: Path, stamp: Tuple[int, int]) -> Optional[array]:
+    try:
+        raw = index_file.read_bytes()
+    except OSError:
+        return None
+    if len(raw) < _INDEX_HEADER.size or _INDEX_HEADER.unpack_from(raw) != stamp:
+        return None
+
+    offsets = array("Q")
+    offsets.frombytes(raw[_INDEX_HEADER.size :])
+    return offsets
+
+
+def _write_index(index_file: Path, stamp: Tuple[int, int], offsets: array):
+    index_file.parent.mkdir(parents=True, exist_ok=True)
+    with AtomicFile(index_file, "wb") as fh:
+        fh.write(_INDEX_HEADER.pack(*stamp))
+        fh.write(offsets.tobytes())
+        fh.commit()
+
+
+def _iter_lines(path: Path) -> Iterator[str]:
+    """The lines of `path` as `str.splitlines` would split them, read lazily."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            yield from line.splitlines() or [""]
+
+
+def _groups(match: re.Match, decode: bool = False) -> Dict[str, Any]:
+    groups = match.groupdict() or {"value": match.group(0)}
+    if decode:
+        return {k: v.decode("utf-8") if v is not None else None for k, v in groups.items()}
+    return groups
+
 
-    raise ValueError(f"No match found for regex pattern: {pattern}")
+def _unwrap(groups: Dict[str, Any]) -> Any:
+    return groups["value"] if groups.keys() == {"value"} else groups
@@ -1,6 +1,9 @@
 import sys
 from pathlib import Path
-from typing import Any
+from typing import Any, Union
+
+from doc_inject.parsers.cache import load_source
+from doc_inject.parsers.query import resolve_dotted_path
 
 if sys.version_info >= (3, 11):
     import tomllib
@@ -8,19 +11,14 @@ else:
     import tomli as tomllib
 
 
+def load_toml(content: Union[str, bytes]) -> Any:
+    """`tomllib.loads` that also accepts raw UTF-8 bytes."""
+    return tomllib.loads(content.decode("utf-8") if isinstance(content, bytes) else content)
+
+
 def parse_toml(path: Path, query: str) -> Any:
     """
     Load TOML from a file and resolve a dotted key path.
     """
-    data = tomllib.loads(path.read_text(encoding="utf-8"))
-    return _resolve_dotted_path(data, query)
-
-
-def _resolve_dotted_path(data: Any, path: str) -> Any:
-    parts = path.split(".")
-    for key in parts:
-        if isinstance(data, dict) and key in data:
-            data = data[key]
-        else:
-            raise ValueError(f"Key '{key}' not found while traversing: {path}")
-    return data
+    data = load_source(path, "toml", load_toml)
+    return resolve_dotted_path(data, query)
@@ -1,22 +1,34 @@
 from pathlib import Path
-from typing import Any
+from typing import Any, Tuple, Type, Union
 
 import yaml
 
+from doc_inject.parsers.cache import load_source
+from doc_inject.parsers.query import resolve_dotted_path
+
+
+def _select_loader() -> Tuple[Type, str]:
+    """libyaml's CSafeLoader when PyYAML was built with it, the pure-Python SafeLoader otherwise."""
+    loader = getattr(yaml, "CSafeLoader", None)
+    if loader is not None:
+        return loader, "libyaml"
+    return yaml.SafeLoader, "python"
+
+
+_LOADER, YAML_BACKEND = _select_loader()
+
+
+def load_yaml(content: Union[str, bytes]) -> Any:
+    """
+    Equivalent of `yaml.safe_load` using the fastest available loader.
+    Raw bytes are accepted, so sources need not be decoded first.
+    """
+    return yaml.load(content, Loader=_LOADER)
+
 
 def parse_yaml(path: Path, query: str) -> Any:
     """
     Load YAML from a file and resolve a dotted key path.
     """
-    data = yaml.safe_load(path.read_text(encoding="utf-8"))
-    return _resolve_dotted_path(data, query)
-
-
-def _resolve_dotted_path(data: Any, path: str) -> Any:
-    parts = path.split(".")
-    for key in parts:
-        if isinstance(data, dict) and key in data:
-            data = data[key]
-        else:
-            raise ValueError(f"Key '{key}' not found while traversing: {path}")
-    return data
+    data = load_source(path, "yaml", load_yaml)
+    return resolve_dotted_path(data, query)
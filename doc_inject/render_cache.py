@@ -0,0 +1,186 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from doc_inject.files import write_atomic
+
+if TYPE_CHECKING:
+    from doc_inject.config import InjectItem
+
+DEFAULT_CACHE_DIR = Path(".doc-inject-cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class RenderCache:
+    """
+    Opt-in on-disk cache of rendered blocks.
+
+    Entries are keyed by a hash of everything a rendering depends on: the content
+    of every source file, the query or vars, parser, template, strict flag and the
+    doc-inject version. A hit lets the engine splice the block without loading
+    sources or rendering the template.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.values = ValueStore(self.directory / "values")
+        self.line_indexes = self.directory / "lines"
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def key_for(self, item: "InjectItem") -> Optional[str]:
+        """Cache key of `item`, or None if a source cannot be hashed."""
+        from doc_inject.template import resolve_strict_from_env
+
+        try:
+            sources = [[path.as_posix(), self._file_digest(path)] for path in item._resolved_files]
+        except OSError:
+            return None
+
+        strict = item.strict_template
+        payload = {
+            "version": _version(),
+            "parser": item.parser,
+            "query": item.query,
+            "vars": item.vars,
+            "template": item.template,
+            "strict": resolve_strict_from_env() if strict is None else strict,
+            "sources": sources,
+        }
+        return _digest(payload)
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._entry_path(key)
+        try:
+            rendered = path.read_text(encoding="utf-8")
+            os.utime(path)  # keep recently used entries on prune
+        except OSError:
+            return None
+        return rendered
+
+    def put(self, key: str, rendered: str):
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, rendered)
+
+    def prune(self, max_bytes: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Delete least recently used entries until the cache fits in `max_bytes`.
+        Returns the number of removed entries and the remaining size in bytes.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        paths = [
+            *(self.directory / "renders").glob("*/*"),
+            *self.values.directory.glob("*"),
+            *self.line_indexes.glob("*"),
+        ]
+        for path in paths:
+            stat = path.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            path.unlink()
+            total -= size
+            removed += 1
+
+        return removed, total
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / "renders" / key[:2] / key
+
+    def _file_digest(self, path: Path) -> str:
+        stat = os.stat(path)
+        stamp = (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    sha.update(chunk)
+            digest = self._digests[stamp] = sha.hexdigest()
+        return digest
+
+
+class ValueStore:
+    """
+    Persistent per-source query results for glob items.
+
+    Results are stored per (parser, expression, scope) and keyed by source path,
+    mtime and size, so a glob only re-parses files that were added or changed
+    since the last run; deleted files drop out of the store. `scope` identifies
+    the set of paths queried (e.g. the glob patterns), so items sharing an
+    expression over different sources keep separate tables.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def query(
+        self,
+        paths: Sequence[Path],
+        parser: str,
+        expression: str,
+        compute: Callable[[Path], Any],
+        scope: Any = None,
+    ) -> List[Any]:
+        table_path = self.directory / _digest([parser, expression, scope])
+        table = self._load(table_path)
+
+        values = []
+        updated = {}
+        for path in paths:
+            stat = os.stat(path)
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            entry = table.get(path.as_posix())
+            if entry is not None and entry[:2] == stamp:
+                value = entry[2]
+            else:
+                value = compute(path)
+                # values that do not survive a JSON round trip are recomputed each run
+                if parser == "json" or _json_round_trips(value):
+                    entry = [*stamp, value]
+                else:
+                    entry = None
+            if entry is not None:
+                updated[path.as_posix()] = entry
+            values.append(value)
+
+        if updated != table:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            write_atomic(table_path, json.dumps(updated))
+        return values
+
+    def _load(self, table_path: Path) -> Dict[str, list]:
+        try:
+            return json.loads(table_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _json_round_trips(value: Any) -> bool:
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def _version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("doc-inject")
+    except PackageNotFoundError:
+        return "unknown"
@@ -1,7 +1,13 @@
 import os
+from functools import lru_cache
 from typing import Dict
 
-from jinja2 import Environment, StrictUndefined, Undefined
+from jinja2 import Environment, StrictUndefined, Template, Undefined
+
+_ENVIRONMENTS = {
+    True: Environment(undefined=StrictUndefined),
+    False: Environment(undefined=Undefined),
+}
 
 
 def render_template(template_str: str, context: Dict[str, str], strict: bool | None = None) -> str:
@@ -14,15 +20,19 @@ def render_template(template_str: str, context: Dict[str, str], strict: bool | N
     if strict is None:
         strict = resolve_strict_from_env()
 
-    env = Environment(undefined=StrictUndefined if strict else Undefined)
-
     try:
-        template = env.from_string(template_str)
+        template = compile_template(template_str, bool(strict))
         return template.render(**context)
     except Exception as e:
         raise ValueError(f"Failed to render template: {e}")
 
 
+@lru_cache(maxsize=512)
+def compile_template(template_str: str, strict: bool) -> Template:
+    """Compile a template once per (text, strict) pair on the shared environments."""
+    return _ENVIRONMENTS[strict].from_string(template_str)
+
+
 def resolve_strict_from_env() -> bool:
     raw = os.getenv("DOC_INJECT_STRICT", "true")
     return raw.strip().lower() not in {"0", "false", "no"}
@@ -0,0 +1,228 @@
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+_MAGIC = re.compile(r"[*?\[]")
+
+Listings = Dict[str, List[Tuple[str, bool, bool]]]
+
+# Directory listings of the innermost `shared_listings` block: (name, is_dir, is_symlink) per entry.
+_shared: Optional[Listings] = None
+
+
+def resolve_globs(includes: Iterable[str], excludes: Iterable[str] = ()) -> List[Path]:
+    """
+    Resolve include glob patterns to matching files, skipping excluded paths.
+    Relative patterns are taken from the current directory; results are absolute.
+
+    All patterns are compiled into one matcher and each root directory is walked
+    once with `os.scandir`; excluded directories are pruned before descending.
+    Inside `shared_listings`, directories already listed in that block are reused.
+    Patterns follow `glob` semantics: `**` spans directories and wildcards do not
+    match names starting with a dot.
+    """
+    roots, matcher, literals = _prepare(includes)
+    excluded = _compile(_exclude_regexes(excludes))
+
+    listings = _shared if _shared is not None else {}
+    found = {path for path in literals if os.path.isfile(path) and not _matches(excluded, path)}
+
+    for root, depth in roots.items():
+        for path, is_dir in _walk(root, depth, excluded, listings):
+            if not is_dir and matcher.fullmatch(path):
+                found.add(path)
+
+    return [Path(path) for path in sorted(found)]
+
+
+def first_match(includes: Iterable[str], excludes: Iterable[str] = ()) -> Optional[Path]:
+    """One of the files `resolve_globs` would return, walking only until it is found."""
+    roots, matcher, literals = _prepare(includes)
+    excluded = _compile(_exclude_regexes(excludes))
+
+    for path in literals:
+        if os.path.isfile(path) and not _matches(excluded, path):
+            return Path(path)
+
+    listings = _shared if _shared is not None else {}
+    for root, depth in roots.items():
+        for path, is_dir in _walk(root, depth, excluded, listings):
+            if not is_dir and matcher.fullmatch(path):
+                return Path(path)
+    return None
+
+
+def walked_dirs(includes: Iterable[str], excludes: Iterable[str] = ()) -> List[Path]:
+    """
+    Directories `resolve_globs` lists for these patterns: each root and every
+    directory below it that is neither excluded nor deeper than the patterns reach.
+    A file created or deleted in any of them can change the result.
+    """
+    roots, _, _ = _prepare(includes)
+    excluded = _compile(_exclude_regexes(excludes))
+
+    listings = _shared if _shared is not None else {}
+    dirs = set()
+    for root, depth in roots.items():
+        if os.path.isdir(root):
+            dirs.add(root)
+        dirs.update(path for path, is_dir in _walk(root, depth, excluded, listings) if is_dir)
+
+    return [Path(path) for path in sorted(dirs)]
+
+
+def glob_root(pattern: str) -> Path:
+    """The literal directory a glob pattern is resolved under."""
+    root, parts = _split_pattern(pattern)
+    return Path(root) if parts else Path(root).parent
+
+
+@contextmanager
+def shared_listings() -> Iterator[None]:
+    """
+    Let the `resolve_globs` calls of one pass share directory listings, so a
+    directory under several glob items is listed once. The listings are dropped
+    when the block exits; nested blocks share those of the outermost one.
+    """
+    global _shared
+    if _shared is not None:
+        yield
+        return
+    _shared = {}
+    try:
+        yield
+    finally:
+        _shared = None
+
+
+def _prepare(
+    includes: Iterable[str],
+) -> Tuple[Dict[str, Optional[int]], Optional[Pattern], List[str]]:
+    """Roots to walk with their depth (None for `**`), the matcher, and literal paths."""
+    roots: Dict[str, Optional[int]] = {}
+    regexes = []
+    literals = []
+
+    for pattern in includes:
+        root, parts = _split_pattern(pattern)
+        if not parts:
+            literals.append(root)
+            continue
+        depth = None if "**" in parts else len(parts)
+        if root in roots:
+            depth = None if depth is None or roots[root] is None else max(depth, roots[root])
+        roots[root] = depth
+        regexes.append(_translate(root, parts))
+
+    return roots, _compile(regexes), literals
+
+
+def _walk(
+    root: str, depth: Optional[int], excluded: Optional[Pattern], listings: Listings
+) -> Iterable[Tuple[str, bool]]:
+    """(path, is_dir) of the files below `root`, and of each directory before it is listed."""
+    # real paths of each directory and its ancestors, so `**` can follow
+    # symlinked directories (like glob) without looping on links to an ancestor
+    real_root = os.path.realpath(root)
+    stack = [(root, 0, real_root, frozenset([real_root]))]
+    while stack:
+        directory, level, real, ancestors = stack.pop()
+        for name, is_dir, is_symlink in _listdir(directory, listings):
+            path = f"{directory}/{name}" if directory != "/" else f"/{name}"
+            if _matches(excluded, path):
+                continue
+            if not is_dir:
+                yield path, False
+            elif depth is None:
+                real_child = os.path.realpath(path) if is_symlink else os.path.join(real, name)
+                if real_child not in ancestors:
+                    yield path, True
+                    stack.append((path, level + 1, real_child, ancestors | {real_child}))
+            elif level + 1 < depth:
+                yield path, True
+                stack.append((path, level + 1, real, ancestors))
+
+
+def _listdir(directory: str, listings: Listings) -> List[Tuple[str, bool, bool]]:
+    listing = listings.get(directory)
+    if listing is None:
+        try:
+            with os.scandir(directory) as entries:
+                listing = [(entry.name, _is_dir(entry), entry.is_symlink()) for entry in entries]
+        except OSError:
+            listing = []
+        listings[directory] = listing
+    return listing
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _split_pattern(pattern: str) -> Tuple[str, List[str]]:
+    """Split a pattern into its absolute literal root and the wildcard parts below it."""
+    parts = pattern.split("/")
+    for i, part in enumerate(parts):
+        if _MAGIC.search(part):
+            root = "/".join(parts[:i]) or ("/" if pattern.startswith("/") else ".")
+            return os.path.abspath(root), [p for p in parts[i:] if p]
+    return os.path.abspath(pattern), []
+
+
+def _translate(root: str, parts: List[str]) -> str:
+    regex = re.escape(root.rstrip("/"))
+    for i, part in enumerate(parts):
+        if part == "**":
+            # zero or more non-hidden directories, or everything below when trailing
+            regex += "(?:/(?!\\.)[^/]*)*" if i == len(parts) - 1 else "(?:/(?!\\.)[^/]*)*?"
+        else:
+            regex += "/" + _translate_segment(part)
+    return regex
+
+
+def _translate_segment(segment: str) -> str:
+    regex = "(?!\\.)" if segment[0] in "*?[" else ""
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        i += 1
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = segment.find("]", i + 1 if segment[i : i + 1] in ("!", "]") else i)
+            if end == -1:
+                regex += "\\["
+                continue
+            body = segment[i:end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            regex += f"[{body}]"
+            i = end + 1
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def _exclude_regexes(excludes: Iterable[str]) -> List[str]:
+    regexes = []
+    for pattern in excludes:
+        # `dir/**` also excludes `dir` itself, so the walk never descends into it
+        pattern = pattern[:-3] if pattern.endswith("/**") else pattern
+        root, parts = _split_pattern(pattern)
+        regexes.append(_translate(root, parts) if parts else re.escape(root))
+    return regexes
+
+
+def _compile(regexes: List[str]) -> Optional[Pattern]:
+    return re.compile("|".join(f"(?:{r})" for r in regexes)) if regexes else None
+
+
+def _matches(pattern: Optional[Pattern], path: str) -> bool:
+    return pattern is not None and pattern.fullmatch(path) is not None
@@ -0,0 +1,286 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from doc_inject.config_loader import ExternalConfig
+from doc_inject.engine import inject_from_file
+from doc_inject.graph import DependencyGraph, is_within
+from doc_inject.render_cache import RenderCache
+from doc_inject.walker import shared_listings
+
+# Returned by a watcher when events were lost and everything must be rechecked.
+RESCAN = "*"
+
+
+class PollingWatcher:
+    """Detects changes by comparing mtimes and sizes every `interval` seconds."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._files: Set[str] = set()
+        self._roots: Set[str] = set()
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+
+    def watch(self, files: Iterable[str], roots: Iterable[str]):
+        self._files = set(files)
+        self._roots = set(roots)
+        self._snapshot = self._scan()
+
+    def changes(self, timeout: float) -> Set[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        paths = set(self._files)
+        for root in self._roots:
+            for directory, _, names in os.walk(root):
+                paths.update(os.path.join(directory, name) for name in names)
+
+        snapshot = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+class InotifyWatcher:
+    """Linux inotify watcher on the directories of watched files and below glob roots."""
+
+    _EVENT = struct.Struct("iIII")
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+    _IN_ISDIR = 0x40000000
+    _IN_Q_OVERFLOW = 0x4000
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        self._recursive: Set[str] = set()
+
+    def watch(self, files: Iterable[str], roots: Iterable[str]):
+        for path in files:
+            self._add(os.path.dirname(path))
+        for root in roots:
+            self._recursive.add(root)
+            self._add_tree(root)
+
+    def changes(self, timeout: float) -> Set[str]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed: Set[str] = set()
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += length
+
+            if mask & self._IN_Q_OVERFLOW:
+                changed.add(RESCAN)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name) if name else directory
+            if mask & self._IN_ISDIR and any(is_within(path, root) for root in self._recursive):
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_tree(self, root: str):
+        for directory, _, _ in os.walk(root):
+            self._add(directory)
+
+    def _add(self, directory: str):
+        if directory in self._dirs.values() or not os.path.isdir(directory):
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+
+def create_watcher(polling: bool = False, interval: float = 0.5):
+    """inotify where available, mtime polling otherwise."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(interval)
+
+
+class WatchSession:
+    """
+    Keeps the configs and dependency graph of a set of targets in memory and
+    re-renders only the blocks affected by changed paths.
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[Path],
+        external: Optional[ExternalConfig] = None,
+        config_path: Optional[Path] = None,
+        config_query: Optional[str] = None,
+        cache: Optional[RenderCache] = None,
+    ):
+        self.targets = {os.path.realpath(t): Path(t) for t in targets}
+        self.config_path = os.path.realpath(config_path) if config_path else None
+        self.config_query = config_query
+        self.cache = cache
+        self.graph = DependencyGraph(external)
+        self.errors: Dict[Path, str] = {}
+        self._written: Dict[Path, Tuple[int, int]] = {}
+
+    def watched(self) -> Tuple[Set[str], Set[str]]:
+        """Files and recursive roots a watcher needs to observe."""
+        files = set(self.graph.sources) | set(self.targets)
+        if self.config_path:
+            files.add(self.config_path)
+        return files, set(self.graph.glob_roots)
+
+    def start(self) -> List[Path]:
+        """Load every target and render all of its blocks."""
+        targets = set(self.targets.values())
+        with shared_listings():
+            return self._apply({target: None for target in targets}, reload=targets)
+
+    def handle(self, changed: Set[str]) -> List[Path]:
+        """Re-render the blocks affected by `changed` paths; returns updated targets."""
+        with shared_listings():
+            return self._handle(changed)
+
+    def _handle(self, changed: Set[str]) -> List[Path]:
+        if RESCAN in changed or (self.config_path and self.config_path in changed):
+            if self.config_path:
+                try:
+                    self.graph.external = ExternalConfig.load(
+                        Path(self.config_path), query=self.config_query
+                    )
+                except Exception as e:
+                    self.errors[Path(self.config_path)] = str(e)
+                    return []
+            # files may have been created or deleted without an event of their own
+            for config in self.graph.configs.values():
+                for item in config.get_items().values():
+                    item.reset_resolved_files()
+            return self.start()
+
+        plan: Dict[Path, Optional[Set[str]]] = {}
+        reload: Set[Path] = set()
+        for path in changed:
+            target = self.targets.get(path)
+            if target is not None and not self._own_write(target):
+                plan[target] = None
+                reload.add(target)
+
+            for block in self.graph.affected_by(path):
+                self._plan_block(plan, block)
+
+            if path not in self.graph.sources or not os.path.exists(path):
+                for block in self.graph.globbed_by(path):
+                    if block[0] not in reload:
+                        self.graph.refresh_block(block)
+                    self._plan_block(plan, block)
+
+        return self._apply(plan, reload=reload)
+
+    def _plan_block(self, plan: Dict[Path, Optional[Set[str]]], block: Tuple[Path, str]):
+        target, name = block
+        if target in plan and plan[target] is None:
+            return
+        plan.setdefault(target, set()).add(name)
+
+    def _own_write(self, target: Path) -> bool:
+        return self._written.get(target) == _stamp(target)
+
+    def _apply(self, plan: Dict[Path, Optional[Set[str]]], reload: Set[Path]) -> List[Path]:
+        updated = []
+        for target, names in sorted(plan.items()):
+            try:
+                if target in reload:
+                    self.graph.add_target(target)
+                if inject_from_file(
+                    target, config=self.graph.configs[target], cache=self.cache, only=names
+                ):
+                    updated.append(target)
+            except Exception as e:
+                self.errors[target] = str(e)
+            self._written[target] = _stamp(target)
+        return updated
+
+
+def watch(
+    session: WatchSession,
+    watcher,
+    debounce: float = 0.2,
+    report: Callable[[str], None] = print,
+    should_stop: Callable[[], bool] = lambda: False,
+):
+    """Run `session` until `should_stop` returns True, re-rendering on each batch of changes."""
+    _report(session, session.start(), report)
+    watcher.watch(*session.watched())
+
+    try:
+        while not should_stop():
+            changed = watcher.changes(timeout=1.0)
+            if not changed:
+                continue
+            # debounce: keep collecting until the tree has been quiet for a moment
+            while True:
+                more = watcher.changes(timeout=debounce)
+                if not more:
+                    break
+                changed |= more
+            _report(session, session.handle(changed), report)
+            watcher.watch(*session.watched())
+    finally:
+        watcher.close()
+
+
+def _report(session: WatchSession, updated: List[Path], report: Callable[[str], None]):
+    for target in updated:
+        report(f"updated {target}")
+    for target, error in session.errors.items():
+        report(f"{target}: {error}")
+
+    session.errors.clear()
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,139 @@
+import json
+import os
+from textwrap import dedent
+
+import pytest
+from typer.testing import CliRunner
+
+from doc_inject.cli import app
+
+runner = CliRunner()
+
+
+def _write_readme(tmp_path, name="README.md", body="placeholder"):
+    data_path = tmp_path / "data.json"
+    data_path.write_text(json.dumps({"uid": "abc123"}))
+
+    readme_path = tmp_path / name
+    readme_path.write_text(
+        dedent("""\
+        <!-- doc-inject:configure
+        {
+          "uid": {
+            "file": "data.json",
+            "query": "$.uid",
+            "template": "UID: {{ value }}"
+          }
+        }
+        -->
+
+        <!-- DOC_INJECT_START uid -->
+        <body>
+        <!-- DOC_INJECT_END uid -->
+        """).replace("<body>", body)
+    )
+    return readme_path
+
+
+def test_check_reports_files_that_would_change(tmp_path):
+    readme_path = _write_readme(tmp_path)
+    original = readme_path.read_text()
+
+    result = runner.invoke(app, ["run", "--check", str(readme_path)])
+
+    assert result.exit_code == 1
+    assert f"would update {readme_path}" in result.output
+    assert readme_path.read_text() == original
+
+
+def test_check_passes_on_up_to_date_files(tmp_path):
+    readme_path = _write_readme(tmp_path, body="UID: abc123")
+
+    result = runner.invoke(app, ["run", "--check", str(readme_path)])
+
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+def test_unchanged_file_is_not_rewritten(tmp_path):
+    readme_path = _write_readme(tmp_path, body="UID: abc123")
+    os.utime(readme_path, ns=(0, 0))
+
+    result = runner.invoke(app, ["run", str(readme_path)])
+
+    assert result.exit_code == 0
+    assert readme_path.stat().st_mtime_ns == 0
+
+
+def test_run_processes_multiple_files(tmp_path):
+    first = _write_readme(tmp_path, name="first.md")
+    second = _write_readme(tmp_path, name="second.md")
+
+    result = runner.invoke(app, ["run", str(first), str(second)])
+
+    assert result.exit_code == 0
+    assert "UID: abc123" in first.read_text()
+    assert "UID: abc123" in second.read_text()
+
+
+def test_jobs_processes_files_in_parallel_and_reports_errors_in_order(tmp_path):
+    good = [_write_readme(tmp_path, name=f"doc{i}.md") for i in range(4)]
+    broken = tmp_path / "broken.md"
+    broken.write_text("<!-- DOC_INJECT_START uid -->\n<!-- DOC_INJECT_END uid -->\n")
+
+    result = runner.invoke(app, ["run", "--jobs", "2", str(broken), *map(str, good)])
+
+    assert result.exit_code == 1
+    assert f"{broken}: No usable config block found" in result.output
+    for path in good:
+        assert "UID: abc123" in path.read_text()
+
+
+def test_check_output_is_ordered_with_jobs(tmp_path):
+    paths = [_write_readme(tmp_path, name=f"doc{i}.md") for i in range(5)]
+
+    result = runner.invoke(app, ["run", "--check", "-j", "3", *map(str, paths)])
+
+    assert result.exit_code == 1
+    assert result.output.splitlines() == [f"would update {path}" for path in paths]
+
+
+def test_stream_updates_file(tmp_path):
+    readme_path = _write_readme(tmp_path)
+
+    result = runner.invoke(app, ["run", "--engine", "stream", str(readme_path)])
+
+    assert result.exit_code == 0
+    assert "UID: abc123" in readme_path.read_text()
+
+
+def test_backends_reports_yaml_loader():
+    from doc_inject.parsers.yaml import YAML_BACKEND
+
+    result = runner.invoke(app, ["backends"])
+
+    assert result.exit_code == 0
+    assert f"yaml: {YAML_BACKEND}" in result.output
+    assert "json: " in result.output
+
+
+def test_json_backend_option(tmp_path):
+    readme_path = _write_readme(tmp_path)
+
+    result = runner.invoke(app, ["run", "--json-backend", "json", str(readme_path)])
+
+    assert result.exit_code == 0
+    assert "UID: abc123" in readme_path.read_text()
+
+
+@pytest.mark.parametrize("command", ["run", "deps", "watch"])
+def test_unloadable_config_is_reported_without_traceback(tmp_path, command):
+    readme = tmp_path / "README.md"
+    readme.write_text("# Title\n")
+    missing = tmp_path / "missing.yaml"
+
+    result = runner.invoke(app, [command, "--config", str(missing), str(readme)])
+
+    assert result.exit_code == 1
+    assert f"{missing}: Config file not found" in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
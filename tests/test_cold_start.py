@@ -0,0 +1,61 @@
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from doc_inject.cli import app
+from doc_inject.engine import has_markers
+
+runner = CliRunner()
+
+RUN_CLI = "import sys; from doc_inject.cli import app; sys.argv[0] = 'doc-inject'; app()"
+
+# Imported only once a config, source or template needs them.
+DEFERRED = ("pydantic", "jinja2", "yaml", "json5", "jsonpath_ng", "ply", "tomllib", "tomli")
+
+# Total import time of a run over a document without markers: about 170 ms
+# when this was set, against about 480 ms with everything imported eagerly.
+IMPORT_BUDGET_MS = 300
+
+
+def _importtime(*args):
+    """(module, cumulative microseconds) of each top-level import of a CLI run."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_CLI, *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # nested imports are indented below the single space after the bar
+        imports.append((name[1:], int(cumulative)))
+    return imports
+
+
+def test_run_without_markers_stays_within_import_budget(tmp_path):
+    document = tmp_path / "CONTRIBUTING.md"
+    document.write_text("# Contributing\n\nNo injection blocks here.\n")
+
+    imports = _importtime("run", str(document))
+
+    imported = {name.strip().split(".")[0] for name, _ in imports}
+    assert not imported.intersection(DEFERRED)
+    total_ms = sum(us for name, us in imports if not name.startswith(" ")) / 1000
+    assert total_ms < IMPORT_BUDGET_MS
+
+
+def test_config_is_not_read_without_markers(tmp_path):
+    document = tmp_path / "README.md"
+    document.write_text("<!-- doc-inject:configure\n{not: [valid\n-->\n# Title\n")
+    empty = tmp_path / "empty.md"
+    empty.write_text("")
+
+    result = runner.invoke(app, ["run", str(document), str(empty)])
+
+    assert result.exit_code == 0, result.output
+    assert not has_markers(document)
+    assert not has_markers(empty)
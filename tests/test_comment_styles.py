@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from textwrap import dedent
 
+from doc_inject.config import InjectConfig
 from doc_inject.config_loader import extract_config_from_document
 from doc_inject.engine import inject_from_file
 
@@ -39,3 +40,20 @@ def test_injection_comment_styles_without_html_multiline(tmp_path: Path):
 
         result = file.read_text()
         assert "* Test Dash" in result, f"Injection failed for comment style: {style}"
+
+
+def test_line_comment_markers_are_idempotent(tmp_path: Path):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps({"title": "Test Dash"}))
+    config = InjectConfig.model_validate(
+        {"blk": {"file": source.as_posix(), "query": "$.title", "template": "{{ value }}"}}
+    )
+    file = tmp_path / "settings.yaml"
+    file.write_text("# DOC_INJECT_START blk\nold\n# DOC_INJECT_END blk\nkey: 1\n")
+
+    inject_from_file(file, config=config)
+    first = file.read_text()
+
+    assert not inject_from_file(file, config=config, check=True)
+    inject_from_file(file, config=config)
+    assert file.read_text() == first
@@ -131,3 +131,63 @@ def test_parse_valid_json5_fallback():
     assert parsed["example"]["file"] == "data.json"
     assert parsed["example"]["template"] == "{{ value }}"
     assert parsed["example"]["query"] == "$.uid"
+
+
+def test_extraction_stops_reading_after_the_config_block(tmp_path):
+    path = tmp_path / "README.md"
+    path.write_bytes(
+        b'<!-- doc-inject:configure {"uid": {"file": "data.json", "query": "$.uid", '
+        b'"template": "{{ value }}"}} -->\n' + b"filler\n" * 100000 + b"\xff invalid utf-8\n"
+    )
+
+    assert "uid" in extract_config_from_document(path).get_items()
+
+
+def test_extract_with_directive_on_the_line_after_the_comment_opener(tmp_path):
+    md = _write_file(
+        tmp_path,
+        "README.md",
+        """
+        Intro <!-- unrelated -->
+        <!--
+          doc-inject:configure
+          example: {file: data.json, query: $.uid, template: "{{ value }}"}
+        -->
+    """,
+    )
+
+    assert "example" in extract_config_from_document(md).get_items()
+
+
+def test_extract_skips_asciidoc_comments_that_are_not_configs(tmp_path):
+    notes = "".join(f"////\nnote {i}\n////\n" for i in range(500))
+    adoc = _write_file(
+        tmp_path,
+        "guide.adoc",
+        notes
+        + dedent("""
+        [comment]
+        doc-inject:configure
+        example: {file: data.json, query: $.uid, template: "{{ value }}"}
+
+        Text.
+        """),
+    )
+
+    assert list(extract_config_from_document(adoc).get_items()) == ["example"]
+
+
+def test_extract_uses_the_first_config_block_in_any_style_of_the_extension_chain(tmp_path):
+    template = _write_file(
+        tmp_path,
+        "settings.json.j2",
+        """
+        // doc-inject:configure
+        // {"first": {"file": "data.json", "query": "$.uid", "template": "{{ value }}"}}
+        {# doc-inject:configure
+        {"second": {"file": "data.json", "query": "$.uid", "template": "{{ value }}"}}
+        #}
+    """,
+    )
+
+    assert list(extract_config_from_document(template).get_items()) == ["first"]
@@ -0,0 +1,107 @@
+import json
+from textwrap import dedent
+
+from typer.testing import CliRunner
+
+from doc_inject.cli import app
+
+runner = CliRunner()
+
+
+def _project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data.json").write_text(json.dumps({"uid": "abc"}))
+    (tmp_path / "dashboards" / "team a").mkdir(parents=True)
+    (tmp_path / "dashboards" / "team a" / "db0.json").write_text(json.dumps({"title": "D0"}))
+
+    readme = tmp_path / "README.md"
+    readme.write_text(
+        dedent("""\
+        <!-- doc-inject:configure
+        {
+          "uid": {"file": "data.json", "query": "$.uid", "template": "{{ value }}"},
+          "list": {"glob": "dashboards/**/*.json", "query": "$.title", "template": "{{ value }}"},
+          "unused": {"file": "missing.json", "query": "$", "template": "{{ value }}"}
+        }
+        -->
+        <!-- DOC_INJECT_START uid -->
+        <!-- DOC_INJECT_END uid -->
+        <!-- DOC_INJECT_START list -->
+        <!-- DOC_INJECT_END list -->
+    """)
+    )
+    original = readme.read_text()
+    return original
+
+
+def test_deps_json_lists_sources_and_globbed_directories(tmp_path, monkeypatch):
+    original = _project(tmp_path, monkeypatch)
+
+    result = runner.invoke(app, ["deps", "README.md"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {
+        "README.md": {
+            "config": None,
+            "sources": ["dashboards/team a/db0.json", "data.json"],
+            "directories": ["dashboards", "dashboards/team a"],
+        }
+    }
+    assert (tmp_path / "README.md").read_text() == original
+
+
+def test_deps_make_format_escapes_paths_and_adds_phony_rules(tmp_path, monkeypatch):
+    _project(tmp_path, monkeypatch)
+
+    result = runner.invoke(app, ["deps", "--format", "make", "-o", "README.md.d", "README.md"])
+
+    assert result.exit_code == 0
+    assert (tmp_path / "README.md.d").read_text().splitlines() == [
+        r"README.md: dashboards/team\ a/db0.json data.json dashboards dashboards/team\ a",
+        r"dashboards/team\ a/db0.json:",
+        "data.json:",
+    ]
+
+
+def test_deps_ninja_format_with_external_config(tmp_path, monkeypatch):
+    _project(tmp_path, monkeypatch)
+    (tmp_path / "doc-inject.yaml").write_text(
+        dedent("""\
+        uid:
+          file: data.json
+          query: $.uid
+          template: "{{ value }}"
+    """)
+    )
+
+    result = runner.invoke(app, ["deps", "-f", "ninja", "--config", "doc-inject.yaml", "README.md"])
+
+    assert result.exit_code == 0
+    assert result.output == "README.md: doc-inject.yaml data.json\n"
+
+
+def test_deps_lists_every_walked_directory_but_not_excluded_ones(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for directory in ("data/a", "data/b/c", "data/node_modules/x"):
+        (tmp_path / directory).mkdir(parents=True)
+    (tmp_path / "data" / "a" / "1.json").write_text(json.dumps({"n": 1}))
+    (tmp_path / "README.md").write_text(
+        dedent("""\
+        <!-- doc-inject:configure
+        {"all": {"glob": "data/**/*.json", "exclude": "data/node_modules",
+                 "query": "$.n", "template": "{{ value }}"}}
+        -->
+        <!-- DOC_INJECT_START all -->
+        <!-- DOC_INJECT_END all -->
+    """)
+    )
+
+    result = runner.invoke(app, ["deps", "README.md"])
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["README.md"]["directories"] == [
+        "data",
+        "data/a",
+        "data/b",
+        "data/b/c",
+    ]
@@ -0,0 +1,65 @@
+import json
+from textwrap import dedent
+
+from typer.testing import CliRunner
+
+from doc_inject import config_loader
+from doc_inject.cli import app
+from doc_inject.config_loader import ExternalConfig
+
+runner = CliRunner()
+
+
+def _make_tree(tmp_path):
+    (tmp_path / "pyproject.toml").write_text(
+        dedent("""
+            [tool.doc-inject.uid]
+            file = "data.json"
+            query = "$.uid"
+            template = "UID: {{ value }}"
+        """)
+    )
+
+    targets = []
+    for name in ("a", "b"):
+        doc_dir = tmp_path / name
+        doc_dir.mkdir()
+        (doc_dir / "data.json").write_text(json.dumps({"uid": f"uid-{name}"}))
+        for i in range(2):
+            target = doc_dir / f"doc{i}.md"
+            target.write_text("<!-- DOC_INJECT_START uid -->\n<!-- DOC_INJECT_END uid -->\n")
+            targets.append(target)
+    return targets
+
+
+def test_external_config_is_rebased_per_directory(tmp_path):
+    targets = _make_tree(tmp_path)
+    external = ExternalConfig.load(tmp_path / "pyproject.toml")
+
+    first = external.for_target(targets[0])
+    assert external.for_target(targets[1]) is first
+    assert first.get_items()["uid"]._resolved_files == [tmp_path / "a" / "data.json"]
+
+    other = external.for_target(targets[2])
+    assert other.get_items()["uid"]._resolved_files == [tmp_path / "b" / "data.json"]
+
+
+def test_cli_parses_external_config_once(tmp_path, monkeypatch):
+    targets = _make_tree(tmp_path)
+    calls = []
+    original = config_loader.extract_config_from_file
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(config_loader, "extract_config_from_file", counting)
+
+    result = runner.invoke(
+        app, ["run", "-j", "1", "--config", str(tmp_path / "pyproject.toml"), *map(str, targets)]
+    )
+
+    assert result.exit_code == 0
+    assert len(calls) == 1
+    assert "UID: uid-a" in targets[0].read_text()
+    assert "UID: uid-b" in targets[3].read_text()
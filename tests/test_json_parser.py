@@ -1,10 +1,22 @@
+import json
+import sys
 import tempfile
 from pathlib import Path
 from textwrap import dedent
 
+import json5
 import pytest
 
-from doc_inject.parsers.json import parse_json
+from doc_inject.parsers import json as json_parser
+from doc_inject.parsers.cache import clear_source_cache
+from doc_inject.parsers.json import (
+    _backend,
+    json_backend,
+    loads_json,
+    normalize_json5,
+    parse_json,
+)
+from doc_inject.parsers.query import compile_jsonpath, jsonpath_cache_info
 
 
 def test_parse_jsonpath_from_valid_json():
@@ -64,3 +76,133 @@ def test_parse_jsonpath_raises_if_not_found():
         parse_json(path, "$.app.build.timestamp")
 
     assert "No match found for JSONPath query" in str(excinfo.value)
+
+
+def test_jsonpath_expression_compiled_once(tmp_path):
+    for i in range(3):
+        (tmp_path / f"db{i}.json").write_text(f'{{"panels": [{{"title": "p{i}"}}]}}')
+
+    compile_jsonpath.cache_clear()
+    titles = [parse_json(path, "$..title") for path in sorted(tmp_path.glob("*.json"))]
+
+    assert titles == ["p0", "p1", "p2"]
+    assert jsonpath_cache_info()["misses"] == 1
+    assert jsonpath_cache_info()["hits"] == 2
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_json_backends_parse_sources_and_fall_back_to_json5(tmp_path, monkeypatch, backend):
+    pytest.importorskip(backend)
+    monkeypatch.setattr(json_parser, "_override", None)
+    monkeypatch.setenv("DOC_INJECT_JSON_BACKEND", backend)
+    clear_source_cache()
+    strict = tmp_path / "strict.json"
+    strict.write_bytes('{"title": "Caf\u00e9"}'.encode("utf-8"))
+    relaxed = tmp_path / "relaxed.json"
+    relaxed.write_text("{title: 'Relaxed',}")
+
+    assert json_backend() == backend
+    assert parse_json(strict, "$.title") == "Caf\u00e9"
+    assert parse_json(relaxed, "$.title") == "Relaxed"
+
+
+def test_auto_json_backend_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "ujson", None)
+    monkeypatch.setattr(json_parser, "_override", None)
+    monkeypatch.delenv("DOC_INJECT_JSON_BACKEND", raising=False)
+    _backend.cache_clear()
+
+    try:
+        assert json_backend() == "json"
+        assert loads_json(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    finally:
+        _backend.cache_clear()
+
+
+def test_unavailable_json_backend_is_reported(monkeypatch):
+    monkeypatch.setitem(sys.modules, "ujson", None)
+    monkeypatch.setattr(json_parser, "_override", None)
+    monkeypatch.setenv("DOC_INJECT_JSON_BACKEND", "ujson")
+    _backend.cache_clear()
+
+    try:
+        with pytest.raises(ValueError, match="JSON backend 'ujson' is not installed"):
+            loads_json(b"{}")
+    finally:
+        _backend.cache_clear()
+
+
+def test_normalize_json5_rewrites_common_syntax():
+    content = dedent("""\
+        // comment
+        {
+          key: 'it\\'s "quoted"', /* block */
+          "url": "http://example.com/*not a comment*/",
+          list: [1, 2,],
+        }
+        """)
+
+    assert json.loads(normalize_json5(content)) == {
+        "key": 'it\'s "quoted"',
+        "url": "http://example.com/*not a comment*/",
+        "list": [1, 2],
+    }
+
+
+def test_json5_source_avoids_json5_library_for_common_syntax(tmp_path, monkeypatch):
+    def fail(content):
+        raise AssertionError("json5 library should not be needed")
+
+    monkeypatch.setattr(json5, "loads", fail)
+    clear_source_cache()
+    path = tmp_path / "data.json5"
+    path.write_text("{title: 'Dash', tags: ['a', 'b',],}")
+
+    assert parse_json(path, "$.title") == "Dash"
+
+
+def test_exotic_json5_falls_back_to_json5_library(tmp_path):
+    clear_source_cache()
+    path = tmp_path / "data.json"
+    path.write_text("{mask: 0xFF, ratio: .5, big: +Infinity}")
+
+    assert parse_json(path, "$.mask") == 255
+    assert parse_json(path, "$.big") == float("inf")
+
+
+def test_strict_json_with_urls_and_apostrophes_skips_the_normaliser(tmp_path, monkeypatch):
+    def fail(content):
+        raise AssertionError("strict JSON should not be normalised")
+
+    monkeypatch.setattr(json_parser, "normalize_json5", fail)
+    clear_source_cache()
+    path = tmp_path / "links.json"
+    path.write_text(
+        json.dumps({"url": "https://example.com/a", "note": "it's", "flags": [1, True]})
+    )
+
+    assert parse_json(path, "$.note") == "it's"
+
+
+@pytest.mark.parametrize("backend", ["orjson", "ujson", "json"])
+def test_json_backends_keep_integers_outside_int64(tmp_path, monkeypatch, backend):
+    pytest.importorskip(backend)
+    monkeypatch.setattr(json_parser, "_override", None)
+    monkeypatch.setenv("DOC_INJECT_JSON_BACKEND", backend)
+    clear_source_cache()
+    path = tmp_path / "ids.json"
+    path.write_text(json.dumps({"id": 2**70 + 1, "negative": -(2**70) - 1, "small": 7}))
+
+    assert parse_json(path, "$.id") == 2**70 + 1
+    assert parse_json(path, "$.negative") == -(2**70) - 1
+    assert loads_json(b'{"small": 7, "text": "' + b"1" * 30 + b'"}')["small"] == 7
+
+
+def test_json_rejected_by_a_backend_is_retried_with_stdlib(monkeypatch):
+    def reject(raw):
+        raise ValueError("refused")
+
+    monkeypatch.setattr(json_parser, "_active", lambda: (reject, "orjson"))
+
+    assert loads_json(b'{"a": [1, 2.5]}') == {"a": [1, 2.5]}
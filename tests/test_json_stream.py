@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from doc_inject.parsers.cache import clear_source_cache
+from doc_inject.parsers.json import parse_json
+from doc_inject.parsers.json_stream import StreamUnsupported, is_streamable, stream_query
+from doc_inject.parsers.query import compile_accessor
+
+DOCUMENT = {
+    "info": {"title": "API", "version": "1.2.3"},
+    "paths": {"/a": {"get": {"tags": ["x", "y]}"]}}, "/b": {}},
+    "servers": [{"url": "https://one"}, {"url": "https://two"}],
+    'escaped "key"': {"é": [1, 2.5, None, True]},
+}
+
+
+def _steps(expression):
+    return compile_accessor(expression).steps
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps(DOCUMENT, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("$.info.version", "1.2.3"),
+        ("$.info", DOCUMENT["info"]),
+        ("$.paths['/a'].get.tags[1]", "y]}"),
+        ("$.servers[1].url", "https://two"),
+    ],
+)
+def test_stream_query_matches_full_load(source, expression, expected):
+    for chunk_size in (1, 16, 1 << 20):
+        assert stream_query(source, _steps(expression), json.loads, chunk_size=chunk_size) == [
+            expected
+        ]
+
+
+def test_stream_query_decodes_escaped_keys(source):
+    steps = [("key", 'escaped "key"'), ("key", "é")]
+
+    assert stream_query(source, steps, json.loads, chunk_size=8) == [[1, 2.5, None, True]]
+
+
+def test_stream_query_without_match(source):
+    assert stream_query(source, _steps("$.info.missing"), json.loads) == []
+    assert stream_query(source, _steps("$.servers[5]"), json.loads) == []
+    assert stream_query(source, _steps("$.info[0]"), json.loads) == []
+
+
+def test_stream_query_stops_reading_after_the_match(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text('{"meta": {"count": 3}, "rows": [1, 2, <truncated')
+
+    assert stream_query(path, _steps("$.meta.count"), json.loads, chunk_size=4) == [3]
+
+
+def test_stream_query_returns_the_first_of_duplicated_keys(tmp_path):
+    path = tmp_path / "export.json"
+    path.write_text('{"meta": {"count": 3, "count": 4}, "meta": {"count": 5}}')
+
+    assert stream_query(path, _steps("$.meta.count"), json.loads) == [3]
+
+
+def test_stream_query_rejects_what_it_cannot_handle(tmp_path):
+    path = tmp_path / "relaxed.json"
+    path.write_text("{unquoted: 1}")
+
+    with pytest.raises(StreamUnsupported):
+        stream_query(path, _steps("$.unquoted"), json.loads)
+    assert not is_streamable(_steps("$.servers[*].url"))
+
+
+def test_parse_json_streams_large_files_and_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOC_INJECT_JSON_STREAM_BYTES", "0")
+    clear_source_cache()
+    truncated = tmp_path / "export.json"
+    truncated.write_text('{"meta": {"count": 3}, "rows": [1, 2, <truncated')
+    relaxed = tmp_path / "relaxed.json"
+    relaxed.write_text("{meta: {count: 4}}")
+
+    assert parse_json(truncated, "$.meta.count") == 3
+    assert parse_json(relaxed, "$.meta.count") == 4
+    with pytest.raises(ValueError, match="No match found for JSONPath query: \\$.meta.missing"):
+        parse_json(truncated, "$.meta.missing")
+
+
+def test_parse_json_loads_small_files(tmp_path, monkeypatch):
+    monkeypatch.delenv("DOC_INJECT_JSON_STREAM_BYTES", raising=False)
+    clear_source_cache()
+    truncated = tmp_path / "export.json"
+    truncated.write_text('{"meta": {"count": 3}, "rows": [1, 2, <truncated')
+
+    with pytest.raises(ValueError, match="Failed to parse"):
+        parse_json(truncated, "$.meta.count")
@@ -0,0 +1,75 @@
+import json
+from textwrap import dedent
+
+from doc_inject import config as config_module
+from doc_inject.config import InjectItem
+from doc_inject.config_loader import extract_config_from_document
+from doc_inject.engine import inject_from_file
+
+
+def test_only_blocks_present_in_document_are_resolved(tmp_path, monkeypatch):
+    for name in ("used", "unused"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "db.json").write_text(json.dumps({"title": name}))
+
+    readme = tmp_path / "README.md"
+    readme.write_text(
+        dedent("""\
+        <!-- doc-inject:configure
+        {
+          "used": {"glob": "used/*.json", "query": "$.title", "template": "{{ value }}"},
+          "unused": {"glob": "unused/**/*.json", "query": "$.title", "template": "{{ value }}"}
+        }
+        -->
+        <!-- DOC_INJECT_START used -->
+        <!-- DOC_INJECT_END used -->
+    """)
+    )
+
+    resolved = []
+    original = config_module.resolve_file_paths
+
+    def recording(pattern, exclude=()):
+        resolved.append(pattern)
+        return original(pattern, exclude)
+
+    monkeypatch.setattr(config_module, "resolve_file_paths", recording)
+
+    config = extract_config_from_document(readme).with_base_path(tmp_path)
+    assert resolved == []
+
+    inject_from_file(readme, config=config)
+
+    assert resolved == [[(tmp_path / "used/*.json").as_posix()]]
+    assert "used" in readme.read_text()
+
+
+def test_parser_inferred_from_glob_pattern_without_walking(monkeypatch):
+    monkeypatch.setattr(config_module, "first_matching_path", None)
+
+    item = InjectItem(glob="dashboards/**/*.json", query="$", template="{{ value }}")
+
+    assert item.parser == "json"
+
+
+def test_parser_inferred_from_first_match_for_wildcard_extension(tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "values.yaml").write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    item = InjectItem(glob="data/*", query="a", template="{{ value }}")
+
+    assert item.parser == "yaml"
+
+
+def test_parser_inferred_from_first_match_skips_excluded_paths(tmp_path, monkeypatch):
+    (tmp_path / "data" / "node_modules").mkdir(parents=True)
+    (tmp_path / "data" / "node_modules" / "package.json").write_text("{}")
+    (tmp_path / "data" / "values.yaml").write_text("a: 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    item = InjectItem(
+        glob="data/**/*", exclude="**/node_modules", query="a", template="{{ value }}"
+    )
+
+    assert item.parser == "yaml"
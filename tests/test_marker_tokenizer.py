@@ -0,0 +1,74 @@
+from textwrap import dedent
+
+import pytest
+
+from doc_inject.engine import find_block_names, iter_markers, scan_blocks
+
+
+def test_markers_are_found_in_one_pass_with_line_numbers():
+    content = dedent("""\
+        <!-- DOC_INJECT_START a -->
+        old
+        <!-- DOC_INJECT_END a -->
+        # DOC_INJECT_START b-2
+        // DOC_INJECT_END b-2
+        """)
+
+    markers = [(m.kind, m.name, m.line) for m in iter_markers(content)]
+
+    assert markers == [
+        ("START", "a", 1),
+        ("END", "a", 3),
+        ("START", "b-2", 4),
+        ("END", "b-2", 5),
+    ]
+
+
+def test_blocks_are_paired_by_name():
+    content = "<!-- DOC_INJECT_START a -->x<!-- DOC_INJECT_END a --><!-- DOC_INJECT_START ab -->y<!-- DOC_INJECT_END ab -->"
+
+    blocks = scan_blocks(content)
+
+    assert [(start.name, content[start.end : end.start]) for start, end in blocks] == [
+        ("a", "x"),
+        ("ab", "y"),
+    ]
+
+
+def test_nested_blocks_are_content_of_the_outer_block():
+    content = dedent("""\
+        <!-- DOC_INJECT_START outer -->
+        <!-- DOC_INJECT_START inner -->
+        <!-- DOC_INJECT_END inner -->
+        <!-- DOC_INJECT_END outer -->
+        """)
+
+    assert find_block_names(content) == ["outer"]
+
+
+def test_unmatched_markers_are_reported_with_line_numbers():
+    content = dedent("""\
+        <!-- DOC_INJECT_START a -->
+        <!-- DOC_INJECT_END a -->
+        <!-- DOC_INJECT_START b -->
+        text
+        <!-- DOC_INJECT_END c -->
+        """)
+
+    with pytest.raises(ValueError) as exc:
+        scan_blocks(content)
+
+    assert str(exc.value) == (
+        "Unmatched injection markers: DOC_INJECT_START b on line 3, DOC_INJECT_END c on line 5"
+    )
+
+
+def test_start_left_open_inside_a_block_is_unmatched():
+    content = dedent("""\
+        <!-- DOC_INJECT_START a -->
+        <!-- DOC_INJECT_START b -->
+        <!-- DOC_INJECT_END a -->
+        """)
+
+    with pytest.raises(ValueError, match="DOC_INJECT_START b on line 2$"):
+        scan_blocks(content)
@@ -0,0 +1,85 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from doc_inject.config import InjectConfig
+from doc_inject.engine import inject_from_file
+
+
+def _config(tmp_path: Path) -> InjectConfig:
+    data_file = tmp_path / "data.json"
+    data_file.write_text(json.dumps({"uid": "abc123"}))
+    return InjectConfig.model_validate(
+        {"uid": {"file": data_file.as_posix(), "query": "$.uid", "template": "UID: {{ value }}"}}
+    )
+
+
+def _document(newline: bytes = b"\n", prefix: bytes = b"intro") -> bytes:
+    lines = [prefix, b"<!-- DOC_INJECT_START uid -->", b"old", b"<!-- DOC_INJECT_END uid -->", b""]
+    return newline.join(lines)
+
+
+def test_mmap_output_matches_text_mode(tmp_path: Path):
+    text_doc = tmp_path / "text.md"
+    mmap_doc = tmp_path / "mmap.md"
+    text_doc.write_bytes(_document())
+    mmap_doc.write_bytes(_document())
+
+    assert inject_from_file(text_doc, config=_config(tmp_path))
+    assert inject_from_file(mmap_doc, config=_config(tmp_path), engine="mmap")
+
+    assert mmap_doc.read_bytes() == text_doc.read_bytes()
+
+
+def test_mmap_preserves_crlf_and_non_utf8_bytes(tmp_path: Path):
+    document = tmp_path / "README.md"
+    document.write_bytes(_document(b"\r\n", prefix=b"caf\xe9 latin-1"))
+
+    assert inject_from_file(document, config=_config(tmp_path), engine="mmap")
+
+    assert document.read_bytes() == (
+        b"caf\xe9 latin-1\r\n<!-- DOC_INJECT_START uid -->\r\nUID: abc123\r\n"
+        b"<!-- DOC_INJECT_END uid -->\r\n"
+    )
+    assert inject_from_file(document, config=_config(tmp_path), engine="mmap") is False
+
+
+def test_mmap_check_and_unchanged_files_are_not_written(tmp_path: Path):
+    document = tmp_path / "README.md"
+    document.write_bytes(_document())
+    config = _config(tmp_path)
+
+    assert inject_from_file(document, config=config, check=True, engine="mmap")
+    assert document.read_bytes() == _document()
+
+    inject_from_file(document, config=config, engine="mmap")
+    inode = os.stat(document).st_ino
+    assert inject_from_file(document, config=config, engine="mmap") is False
+    assert os.stat(document).st_ino == inode
+
+
+def test_mmap_reports_unmatched_markers(tmp_path: Path):
+    document = tmp_path / "README.md"
+    document.write_bytes(_document().replace(b"<!-- DOC_INJECT_END uid -->", b""))
+
+    with pytest.raises(ValueError, match="DOC_INJECT_START uid on line 2"):
+        inject_from_file(document, config=_config(tmp_path), engine="mmap")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["README.md", "data.json"]
+
+
+def test_mmap_empty_file(tmp_path: Path):
+    document = tmp_path / "README.md"
+    document.write_bytes(b"")
+
+    assert inject_from_file(document, config=_config(tmp_path), engine="mmap") is False
+
+
+def test_unknown_engine_is_rejected(tmp_path: Path):
+    document = tmp_path / "README.md"
+    document.write_bytes(_document())
+
+    with pytest.raises(ValueError, match="Unknown engine"):
+        inject_from_file(document, config=_config(tmp_path), engine="fast")
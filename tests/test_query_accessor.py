@@ -0,0 +1,58 @@
+import pytest
+
+from doc_inject.parsers.query import (
+    compile_accessor,
+    compile_jsonpath,
+    find_jsonpath,
+    resolve_dotted_path,
+)
+
+DATA = {
+    "info": {"version": "1.2.3"},
+    "items": [{"name": "a", "tags": ["x"]}, {"name": "b", "tags": []}],
+    "labels": {"team": "ops", "tier": "gold"},
+    "name": "str",
+    "empty": None,
+    "dash-key": 1,
+}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "$",
+        "$.info.version",
+        "$.items[0].name",
+        "$.items[1]['name']",
+        '$["labels"].team',
+        "$.items[*].name",
+        "$.items[*].tags[*]",
+        "$.labels[*]",
+        "$.labels.*",
+        "$.items.*",
+        "$.items[5]",
+        "$.labels[0]",
+        "$.empty[*]",
+        "$.empty[0]",
+        "$.missing.key",
+        "$.dash-key",
+        "$.name[0]",
+    ],
+)
+def test_fast_path_matches_jsonpath_ng(expression):
+    expected = [match.value for match in compile_jsonpath(expression).find(DATA)]
+    assert find_jsonpath(DATA, expression) == expected
+
+
+@pytest.mark.parametrize("expression", ["$..name", "$.items[0:1]", "$.items[-1]", "info.version"])
+def test_complex_expressions_fall_back_to_jsonpath_ng(expression):
+    assert compile_accessor(expression) is None
+    expected = [match.value for match in compile_jsonpath(expression).find(DATA)]
+    assert find_jsonpath(DATA, expression) == expected
+
+
+def test_dotted_path_accessor():
+    assert resolve_dotted_path(DATA, "info.version") == "1.2.3"
+
+    with pytest.raises(ValueError, match="Key 'build' not found while traversing: info.build"):
+        resolve_dotted_path(DATA, "info.build")
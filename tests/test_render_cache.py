@@ -0,0 +1,90 @@
+import json
+from textwrap import dedent
+
+from typer.testing import CliRunner
+
+from doc_inject.cli import app
+from doc_inject.config_loader import extract_config_from_document
+from doc_inject.engine import inject_from_file
+from doc_inject.parsers import core
+from doc_inject.render_cache import RenderCache
+
+runner = CliRunner()
+
+TARGET = dedent("""\
+    <!-- doc-inject:configure
+    {"uid": {"file": "data.json", "query": "$.uid", "template": "UID: {{ value }}"}}
+    -->
+    <!-- DOC_INJECT_START uid -->
+    <!-- DOC_INJECT_END uid -->
+""")
+
+
+def _inject(readme, cache):
+    config = extract_config_from_document(readme).with_base_path(readme.parent)
+    return inject_from_file(readme, config=config, cache=cache)
+
+
+def test_cached_block_is_spliced_without_resolving_sources(tmp_path, monkeypatch):
+    (tmp_path / "data.json").write_text(json.dumps({"uid": "abc"}))
+    readme = tmp_path / "README.md"
+    readme.write_text(TARGET)
+    cache = RenderCache(tmp_path / "cache")
+
+    _inject(readme, cache)
+
+    def fail(item):
+        raise AssertionError("sources should not be loaded on a cache hit")
+
+    monkeypatch.setattr(core, "resolve_query", fail)
+    readme.write_text(TARGET)
+    _inject(readme, RenderCache(tmp_path / "cache"))
+
+    assert "UID: abc" in readme.read_text()
+
+
+def test_source_change_invalidates_cached_block(tmp_path):
+    data = tmp_path / "data.json"
+    data.write_text(json.dumps({"uid": "abc"}))
+    readme = tmp_path / "README.md"
+    readme.write_text(TARGET)
+
+    _inject(readme, RenderCache(tmp_path / "cache"))
+    data.write_text(json.dumps({"uid": "xyz"}))
+    _inject(readme, RenderCache(tmp_path / "cache"))
+
+    assert "UID: xyz" in readme.read_text()
+
+
+def test_prune_removes_least_recently_used_entries(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    cache.put("aa" * 32, "x" * 10)
+    cache.put("bb" * 32, "y" * 10)
+
+    assert cache.prune(max_bytes=15) == (1, 10)
+    assert cache.get("bb" * 32) == "y" * 10
+
+
+def test_cache_prune_command(tmp_path):
+    cache_dir = tmp_path / "cache"
+    RenderCache(cache_dir).put("aa" * 32, "rendered")
+
+    result = runner.invoke(
+        app, ["cache", "prune", "--cache-dir", str(cache_dir), "--max-bytes", "0"]
+    )
+
+    assert result.exit_code == 0
+    assert "removed 1 entries, 0 bytes remaining" in result.output
+
+
+def test_run_with_cache_dir(tmp_path):
+    (tmp_path / "data.json").write_text(json.dumps({"uid": "abc"}))
+    readme = tmp_path / "README.md"
+    readme.write_text(TARGET)
+    cache_dir = tmp_path / "cache"
+
+    result = runner.invoke(app, ["run", "--cache-dir", str(cache_dir), str(readme)])
+
+    assert result.exit_code == 0
+    assert "UID: abc" in readme.read_text()
+    assert len(list((cache_dir / "renders").glob("*/*"))) == 1
@@ -73,3 +73,25 @@ def test_resolve_query_with_text_regex():
 
     context = resolve_query(item)
     assert context == {"version": "2.4.0"}
+
+
+def test_resolve_query_with_text_vars(tmp_path):
+    path = tmp_path / "CHANGELOG.md"
+    path.write_text("# Changelog\n\n## 2.4.0 - 2025-01-02\n- Added sync support\n")
+
+    item = InjectItem(
+        file=path,
+        parser="text",
+        vars={
+            "release": r"regex:^## (?P<version>[\d.]+) - (?P<date>[\d-]+)",
+            "change": r"regex:^- (.*)",
+            "title": "slice:0:1",
+        },
+        template="{{ release.version }} ({{ release.date }}): {{ change }}",
+    )
+
+    assert resolve_query(item) == {
+        "release": {"version": "2.4.0", "date": "2025-01-02"},
+        "change": "- Added sync support",
+        "title": "# Changelog",
+    }
@@ -0,0 +1,54 @@
+import json
+import os
+
+from doc_inject.config import InjectItem
+from doc_inject.parsers.cache import SourceCache, clear_source_cache, source_cache_info
+from doc_inject.parsers.core import resolve_query
+
+
+def test_vars_parse_source_once(tmp_path):
+    data = tmp_path / "package.json"
+    data.write_text(json.dumps({"name": "pkg", "version": "1.0.0", "license": "MIT"}))
+
+    item = InjectItem(
+        file=data,
+        vars={"name": "$.name", "version": "$.version", "license": "$.license"},
+        template="{{ name }}",
+    )
+
+    clear_source_cache()
+    assert resolve_query(item) == {"name": "pkg", "version": "1.0.0", "license": "MIT"}
+    resolve_query(item)
+
+    info = source_cache_info()
+    assert info["misses"] == 1
+    assert info["hits"] == 5
+
+
+def test_entry_invalidated_when_file_changes(tmp_path):
+    data = tmp_path / "data.json"
+    data.write_text('{"v": 1}')
+
+    cache = SourceCache()
+    assert cache.load(data, "json", json.loads) == {"v": 1}
+
+    data.write_text('{"v": 22}')
+    os.utime(data, ns=(0, 0))
+    assert cache.load(data, "json", json.loads) == {"v": 22}
+    assert cache.info()["entries"] == 1
+
+
+def test_lru_evicts_by_size(tmp_path):
+    files = []
+    for i in range(3):
+        path = tmp_path / f"d{i}.json"
+        path.write_text(json.dumps({"pad": "x" * 50}))
+        files.append(path)
+
+    cache = SourceCache(max_bytes=2 * files[0].stat().st_size)
+    for path in files:
+        cache.load(path, "json", json.loads)
+
+    assert cache.info()["entries"] == 2
+    cache.load(files[0], "json", json.loads)
+    assert cache.info()["misses"] == 4
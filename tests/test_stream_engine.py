@@ -0,0 +1,155 @@
+import json
+import os
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from doc_inject.config import InjectConfig
+from doc_inject.engine import inject_from_file
+
+
+def _write_document(tmp_path: Path, name: str, prefix: str = "<!--", suffix: str = "-->") -> Path:
+    document = tmp_path / name
+    document.write_text(
+        dedent(f"""\
+            intro
+            {prefix} DOC_INJECT_START uid {suffix}
+            old uid
+            {prefix} DOC_INJECT_END uid {suffix}
+            middle {prefix} DOC_INJECT_START title {suffix}old{prefix} DOC_INJECT_END title {suffix} tail
+            outro
+            """)
+    )
+    return document
+
+
+def _config(tmp_path: Path) -> InjectConfig:
+    data_file = tmp_path / "data.json"
+    data_file.write_text(json.dumps({"uid": "abc123", "title": "Dash"}))
+    return InjectConfig.model_validate(
+        {
+            "uid": {"file": data_file.as_posix(), "query": "$.uid", "template": "UID: {{ value }}"},
+            "title": {
+                "file": data_file.as_posix(),
+                "query": "$.title",
+                "template": "Title: {{ value }}",
+            },
+        }
+    )
+
+
+@pytest.mark.parametrize("prefix, suffix", [("#", ""), ("//", ""), (";", "")])
+def test_stream_output_matches_text_mode(tmp_path: Path, prefix, suffix):
+    text_doc = _write_document(tmp_path, "text.md", prefix, suffix)
+    stream_doc = _write_document(tmp_path, "stream.md", prefix, suffix)
+
+    assert inject_from_file(text_doc, config=_config(tmp_path))
+    assert inject_from_file(stream_doc, config=_config(tmp_path), engine="stream")
+
+    assert stream_doc.read_text() == text_doc.read_text()
+    assert "UID: abc123" in stream_doc.read_text()
+
+
+def test_stream_html_markers(tmp_path: Path):
+    text_doc = _write_document(tmp_path, "text.md")
+    stream_doc = _write_document(tmp_path, "stream.md")
+    config = _config(tmp_path)
+
+    inject_from_file(text_doc, config=config)
+    inject_from_file(stream_doc, config=config, engine="stream")
+
+    assert stream_doc.read_text() == text_doc.read_text()
+
+
+def test_stream_leaves_unchanged_file_alone(tmp_path: Path):
+    document = _write_document(tmp_path, "README.md")
+    config = _config(tmp_path)
+    inject_from_file(document, config=config, engine="stream")
+    inode = os.stat(document).st_ino
+
+    assert inject_from_file(document, config=config, engine="stream") is False
+    assert os.stat(document).st_ino == inode
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["README.md", "data.json"]
+
+
+def test_stream_check_does_not_write(tmp_path: Path):
+    document = _write_document(tmp_path, "README.md")
+    original = document.read_text()
+
+    changed = inject_from_file(document, config=_config(tmp_path), check=True, engine="stream")
+
+    assert changed is True
+    assert document.read_text() == original
+
+
+def test_stream_unterminated_block_reports_line(tmp_path: Path):
+    document = _write_document(tmp_path, "README.md")
+    config = _config(tmp_path)
+    original = document.read_text().replace("<!-- DOC_INJECT_END uid -->", "")
+    document.write_text(original)
+
+    with pytest.raises(
+        ValueError, match="Unmatched injection markers: DOC_INJECT_START uid on line 2"
+    ):
+        inject_from_file(document, config=config, engine="stream")
+
+    assert document.read_text() == original
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["README.md", "data.json"]
+
+
+def test_writes_replace_target_atomically_and_keep_mode(tmp_path: Path):
+    document = _write_document(tmp_path, "README.md")
+    document.chmod(0o640)
+    inode = os.stat(document).st_ino
+
+    assert inject_from_file(document, config=_config(tmp_path))
+
+    assert os.stat(document).st_ino != inode
+    assert os.stat(document).st_mode & 0o777 == 0o640
+
+
+@pytest.mark.parametrize("engine", ["text", "stream", "mmap"])
+def test_writes_through_symlinks_and_hard_links(tmp_path: Path, engine):
+    real = tmp_path / "real"
+    real.mkdir()
+    document = _write_document(real, "doc.md")
+    config = _config(tmp_path)
+    link = tmp_path / "link.md"
+    link.symlink_to(document)
+    hard = tmp_path / "hard.md"
+    os.link(document, hard)
+
+    assert inject_from_file(link, config=config, engine=engine)
+
+    assert link.is_symlink()
+    assert "UID: abc123" in document.read_text()
+    assert hard.read_text() == document.read_text()
+    assert os.stat(hard).st_ino == os.stat(document).st_ino
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        "# DOC_INJECT_START uid\n\nold\n# DOC_INJECT_END uid\n",
+        "// DOC_INJECT_START uid  \nold\n// DOC_INJECT_END uid\t\nrest",
+        "; DOC_INJECT_START uid\n; DOC_INJECT_END uid",
+        "<!-- DOC_INJECT_START uid\n-->\nold\n<!--\nDOC_INJECT_END uid -->\n",
+        "a <!-- DOC_INJECT_START uid -->old<!-- DOC_INJECT_END uid --> b\nc",
+        "# DOC_INJECT_START\nuid\n\n# DOC_INJECT_END uid\n\n\nrest #\n",
+        "<!-- DOC_INJECT_START title -->\n# DOC_INJECT_START uid\n# DOC_INJECT_END uid\n"
+        "<!-- DOC_INJECT_END title -->\n",
+    ],
+)
+def test_engines_produce_the_same_output(tmp_path: Path, document):
+    config = _config(tmp_path)
+    outputs = {}
+    for engine in ("text", "stream", "mmap"):
+        target = tmp_path / f"{engine}.md"
+        target.write_bytes(document.encode("utf-8"))
+        inject_from_file(target, config=config, engine=engine)
+        inject_from_file(target, config=config, engine=engine)
+        outputs[engine] = target.read_bytes()
+
+    assert outputs["stream"] == outputs["text"]
+    assert outputs["mmap"] == outputs["text"]
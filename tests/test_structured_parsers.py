@@ -3,9 +3,10 @@ from pathlib import Path
 from textwrap import dedent
 
 import pytest
+import yaml
 
 from doc_inject.parsers.toml import parse_toml
-from doc_inject.parsers.yaml import parse_yaml
+from doc_inject.parsers.yaml import load_yaml, parse_yaml
 
 
 def test_parse_yaml_dotted_path():
@@ -56,3 +57,29 @@ def test_parse_toml_raises_on_invalid_key():
         parse_toml(path, "app.build.timestamp")
 
     assert "Key 'build' not found" in str(excinfo.value)
+
+
+def test_load_yaml_matches_safe_load_for_str_and_bytes():
+    content = dedent("""
+        values:
+          replicas: 3
+          enabled: true
+          tags: [a, b]
+          created: 2024-01-01
+    """)
+
+    assert load_yaml(content) == yaml.safe_load(content)
+    assert load_yaml(content.encode("utf-8")) == yaml.safe_load(content)
+
+
+def test_load_yaml_refuses_unsafe_tags():
+    with pytest.raises(yaml.YAMLError):
+        load_yaml("!!python/object/apply:os.system ['true']")
+
+
+def test_yaml_backend_falls_back_without_libyaml(monkeypatch):
+    from doc_inject.parsers import yaml as yaml_parser
+
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+
+    assert yaml_parser._select_loader() == (yaml.SafeLoader, "python")
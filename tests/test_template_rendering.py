@@ -1,4 +1,4 @@
-from doc_inject.template import render_template
+from doc_inject.template import compile_template, render_template
 
 
 def test_render_template_strict_mode_success():
@@ -26,3 +26,26 @@ def test_render_template_non_strict_renders_empty_on_missing_var():
 
     result = render_template(template, context, strict=False)
     assert result == "Hello, !"
+
+
+def test_render_template_reuses_compiled_template():
+    compile_template.cache_clear()
+
+    for version in ("1.0", "2.0", "3.0"):
+        assert render_template("v{{ version }}", {"version": version}, strict=True) == f"v{version}"
+
+    info = compile_template.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+
+def test_compiled_templates_are_separate_per_strict_flag():
+    compile_template.cache_clear()
+
+    assert render_template("Hi {{ who }}", {}, strict=False) == "Hi "
+    try:
+        render_template("Hi {{ who }}", {}, strict=True)
+    except ValueError as e:
+        assert "Failed to render template" in str(e)
+    else:
+        assert False, "Expected failure due to missing variable in strict mode"
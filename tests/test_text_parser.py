@@ -2,7 +2,24 @@ import tempfile
 from pathlib import Path
 from textwrap import dedent
 
-from doc_inject.parsers.text import parse_text
+import pytest
+
+from doc_inject.parsers import text as text_parser
+from doc_inject.parsers.text import parse_text, parse_text_queries
+
+
+@pytest.fixture
+def mapped_searches(monkeypatch):
+    """Results of the bytes searches over memory-mapped files."""
+    results = []
+    search = text_parser._search_mapped
+
+    def recording(data, pattern):
+        results.append(search(data, pattern))
+        return results[-1]
+
+    monkeypatch.setattr(text_parser, "_search_mapped", recording)
+    return results
 
 
 def test_regex_multiline_with_named_group():
@@ -77,3 +94,135 @@ def test_slice_lines_returns_correct_range():
     expected = {"value": "Line 2\nLine 3\nLine 4"}
 
     assert result == expected
+
+
+def test_whole_file_regex_searches_the_mapped_bytes(tmp_path, mapped_searches):
+    path = tmp_path / "CHANGELOG.md"
+    path.write_text("# Changelog\n\n## 2.0.0 - Cafe\nNotes\n", encoding="utf-8")
+    pattern = r"(?m)^## (?P<version>[0-9.]+) - (?P<name>.+)$"
+
+    assert parse_text(path, f"regex:{pattern}") == {"version": "2.0.0", "name": "Cafe"}
+    assert mapped_searches == [{"version": "2.0.0", "name": "Cafe"}]
+
+
+def test_whole_file_regex_falls_back_where_bytes_would_differ(tmp_path, mapped_searches):
+    crlf = tmp_path / "crlf.txt"
+    crlf.write_bytes(b"version: 1.0\r\nname: x\r\n")
+    unicode = tmp_path / "unicode.txt"
+    unicode.write_text("name: Café\n", encoding="utf-8")
+
+    assert parse_text(crlf, r"regex:(?m)^version: (?P<v>.*)$") == {"v": "1.0"}
+    assert parse_text(unicode, r"regex:(?m)^name: (?P<n>\w+)$") == {"n": "Café"}
+    assert mapped_searches == []
+
+
+@pytest.mark.parametrize("pattern", [r"(?m)name: (?P<c>.)!", r"(?m)name: (?P<c>[^!])!"])
+def test_whole_file_regex_matches_characters_not_bytes(tmp_path, mapped_searches, pattern):
+    path = tmp_path / "names.txt"
+    path.write_text("name: é!\n", encoding="utf-8")
+
+    assert parse_text(path, f"regex:{pattern}") == {"c": "é"}
+    assert mapped_searches == []
+
+
+@pytest.mark.parametrize(
+    "content", [b"first\nlast\n", "caf\u00e9\nlast\n".encode(), b"first\r\nlast\r\n"]
+)
+def test_whole_file_regex_ignores_the_final_newline(tmp_path, content):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(content)
+
+    assert parse_text(path, r"regex:(?s)last(?P<rest>.*)") == {"rest": ""}
+    assert parse_text(path, r"regex:(?s)\n(?P<last>\w+)\Z") == {"last": "last"}
+
+
+def test_line_regex_stops_reading_at_the_first_match(tmp_path):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"start\nversion=1.2.3\n" + b"filler\n" * 200000 + b"\xff invalid utf-8\n")
+
+    assert parse_text(path, r"regex:version=(?P<v>\S+)") == {"v": "1.2.3"}
+
+
+@pytest.mark.parametrize(
+    "content", ["", "\n", "a", "a\n", "a\nb", "a\n\nb\n", "é\nü\n\nlast"], ids=repr
+)
+@pytest.mark.parametrize("head_lines", [0, 10000])
+def test_slices_match_splitlines(tmp_path, monkeypatch, content, head_lines):
+    monkeypatch.setattr(text_parser, "HEAD_LINES", head_lines)
+    path = tmp_path / "notes.txt"
+    path.write_bytes(content.encode("utf-8"))
+    lines = content.splitlines()
+
+    for start, end in [(0, 2), (1, 3), (-2, 5), (0, -1), (3, 1), (-10, 10)]:
+        result = parse_text(path, f"slice:{start}:{end}")
+        assert result == {"value": "\n".join(lines[start:end])}, (start, end)
+
+
+def test_line_index_is_persisted_and_invalidated(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_parser, "_INDEXES", {})
+    monkeypatch.setattr(text_parser, "_index_directory", tmp_path / "lines")
+    path = tmp_path / "big.log"
+    path.write_text("".join(f"line {i}\n" for i in range(20000)))
+
+    assert parse_text(path, "slice:15000:15002") == {"value": "line 15000\nline 15001"}
+    assert len(list((tmp_path / "lines").iterdir())) == 1
+
+    text_parser._INDEXES.clear()
+    monkeypatch.setattr(text_parser, "_build_index", lambda real: pytest.fail("index rebuilt"))
+    assert parse_text(path, "slice:-1:20000") == {"value": "line 19999"}
+
+    monkeypatch.undo()
+    monkeypatch.setattr(text_parser, "_INDEXES", {})
+    monkeypatch.setattr(text_parser, "_index_directory", tmp_path / "lines")
+    path.write_text("".join(f"row {i}\n" for i in range(20001)))
+    assert parse_text(path, "slice:-1:20001") == {"value": "row 20000"}
+
+
+def test_head_slice_stops_reading_early(tmp_path):
+    path = tmp_path / "big.log"
+    path.write_bytes(b"first\nsecond\n" + b"filler\n" * 200000 + b"\xff invalid utf-8\n")
+
+    assert parse_text(path, "slice:0:2") == {"value": "first\nsecond"}
+
+
+def test_queries_share_one_pass_over_the_file(tmp_path, mapped_searches):
+    path = tmp_path / "CHANGELOG.md"
+    path.write_bytes(
+        "# Changelog\n\n## 2.0.0 - Café\nversion=2.0.0\nauthor: Ann\n".encode("utf-8")
+        + b"filler\n" * 200000
+        + b"\xff invalid utf-8\n"
+    )
+    queries = {
+        "version": r"regex:version=(.*)",
+        "author": r"regex:author: (?P<name>\w+)",
+        "title": "slice:0:1",
+    }
+
+    assert parse_text_queries(path, queries) == {
+        "version": "version=2.0.0",
+        "author": {"name": "Ann"},
+        "title": "# Changelog",
+    }
+    assert mapped_searches == []
+
+
+def test_whole_file_queries_share_the_decoded_text(tmp_path, monkeypatch):
+    path = tmp_path / "notes.txt"
+    path.write_text("name: Café\nversion: 1.0\n", encoding="utf-8")
+    monkeypatch.setattr(text_parser, "_search_mapped", lambda data, pattern: pytest.fail())
+
+    result = parse_text_queries(
+        path, {"name": r"regex:(?m)^name: (\w+)$", "version": r"regex:(?m)^version: (?P<v>.*)$"}
+    )
+
+    assert result == {"name": "name: Café", "version": {"v": "1.0"}}
+
+
+def test_queries_report_the_pattern_without_match(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("version: 1.0\n")
+
+    with pytest.raises(ValueError, match="No match found for regex pattern: author"):
+        parse_text_queries(path, {"version": "regex:version", "author": "regex:author"})
+    with pytest.raises(ValueError, match=r"No match found for regex pattern: \(\?m\)author"):
+        parse_text_queries(path, {"author": "regex:(?m)author"})
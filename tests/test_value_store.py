@@ -0,0 +1,89 @@
+import json
+import os
+
+from doc_inject.config import InjectItem
+from doc_inject.parsers import json as json_parser
+from doc_inject.parsers.core import resolve_query
+from doc_inject.render_cache import ValueStore
+
+
+def _dashboards(tmp_path, count):
+    for i in range(count):
+        (tmp_path / f"db{i}.json").write_text(json.dumps({"uid": f"uid-{i}"}))
+
+
+def _item(tmp_path):
+    item = InjectItem(glob="*.json", query="$.uid", template="{{ value }}")
+    item.set_base_path(tmp_path)
+    return item
+
+
+def test_only_changed_and_added_sources_are_reparsed(tmp_path, monkeypatch):
+    _dashboards(tmp_path, 4)
+    store = ValueStore(tmp_path / "store")
+    assert resolve_query(_item(tmp_path), values=store) == {
+        "value": ["uid-0", "uid-1", "uid-2", "uid-3"]
+    }
+
+    parsed = []
+    original = json_parser.parse_json
+
+    def recording(path, query):
+        parsed.append(path.name)
+        return original(path, query)
+
+    monkeypatch.setattr(json_parser, "parse_json", recording)
+
+    (tmp_path / "db1.json").write_text(json.dumps({"uid": "changed"}))
+    os.utime(tmp_path / "db1.json", ns=(1, 1))
+    (tmp_path / "db3.json").unlink()
+    (tmp_path / "db4.json").write_text(json.dumps({"uid": "added"}))
+
+    result = resolve_query(_item(tmp_path), values=ValueStore(tmp_path / "store"))
+
+    assert result == {"value": ["uid-0", "changed", "uid-2", "added"]}
+    assert sorted(parsed) == ["db1.json", "db4.json"]
+
+
+def test_deleted_sources_are_dropped_from_the_store(tmp_path):
+    _dashboards(tmp_path, 2)
+    store = ValueStore(tmp_path / "store")
+    resolve_query(_item(tmp_path), values=store)
+
+    (tmp_path / "db1.json").unlink()
+    resolve_query(_item(tmp_path), values=store)
+
+    (table,) = (tmp_path / "store").iterdir()
+    assert list(json.loads(table.read_text())) == [(tmp_path / "db0.json").as_posix()]
+
+
+def test_globs_sharing_an_expression_keep_separate_tables(tmp_path, monkeypatch):
+    for directory in ("a", "b"):
+        (tmp_path / directory).mkdir()
+        for i in range(3):
+            (tmp_path / directory / f"{i}.json").write_text(json.dumps({"uid": f"{directory}{i}"}))
+    items = []
+    for directory in ("a", "b"):
+        item = InjectItem(glob=f"{directory}/*.json", query="$.uid", template="{{ value }}")
+        item.set_base_path(tmp_path)
+        items.append(item)
+
+    store = ValueStore(tmp_path / "store")
+    assert [resolve_query(item, values=store) for item in items] == [
+        {"value": ["a0", "a1", "a2"]},
+        {"value": ["b0", "b1", "b2"]},
+    ]
+
+    parsed = []
+    original = json_parser.parse_json
+
+    def recording(path, query):
+        parsed.append(path.name)
+        return original(path, query)
+
+    monkeypatch.setattr(json_parser, "parse_json", recording)
+    for _ in range(2):
+        for item in items:
+            resolve_query(item, values=ValueStore(tmp_path / "store"))
+
+    assert parsed == []
@@ -0,0 +1,112 @@
+import json
+import os
+from glob import glob
+from pathlib import Path
+
+import pytest
+
+from doc_inject.config import InjectItem
+from doc_inject.parsers.core import resolve_query
+from doc_inject.walker import resolve_globs, shared_listings
+
+FILES = [
+    "a.json",
+    "b.yaml",
+    ".hidden.json",
+    "x/c.json",
+    "x/y/d.json",
+    "x/.cache/e.json",
+    "node_modules/m.json",
+    "x/node_modules/n.json",
+    "db1.json",
+    "db5.json",
+]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name in FILES:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"name": name}))
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["*.json", "**/*.json", "x/**", "x/*/*.json", "db[0-2].json", "db[!0-2].json", "a.json"],
+)
+def test_matches_glob_semantics(tree, pattern):
+    full = f"{tree}/{pattern}"
+    expected = sorted(Path(p) for p in glob(full, recursive=True) if os.path.isfile(p))
+
+    assert resolve_globs([full]) == expected
+
+
+@pytest.mark.parametrize("pattern", ["**/*.json", "link/**", "*/*.json"])
+def test_follows_symlinked_directories_like_glob(tmp_path, pattern):
+    (tmp_path / "src" / "c").mkdir(parents=True)
+    (tmp_path / "src" / "2.json").write_text("{}")
+    (tmp_path / "src" / "c" / "3.json").write_text("{}")
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / "1.json").write_text("{}")
+    (tmp_path / "repo" / "link").symlink_to(tmp_path / "src")
+
+    full = f"{tmp_path}/repo/{pattern}"
+    expected = sorted(Path(p) for p in glob(full, recursive=True) if os.path.isfile(p))
+
+    assert resolve_globs([full]) == expected
+    assert any("link" in p.parts for p in expected)
+
+
+def test_symlink_cycles_are_walked_once(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "1.json").write_text("{}")
+    (tmp_path / "a" / "loop").symlink_to(tmp_path)
+
+    assert resolve_globs([f"{tmp_path}/**/*.json"]) == [tmp_path / "a" / "1.json"]
+
+
+def test_excluded_directories_are_pruned(tree):
+    result = resolve_globs(
+        [f"{tree}/**/*.json", f"{tree}/*.yaml"],
+        [f"{tree}/**/node_modules/**", f"{tree}/db*.json"],
+    )
+
+    assert [p.relative_to(tree).as_posix() for p in result] == [
+        "a.json",
+        "b.yaml",
+        "x/c.json",
+        "x/y/d.json",
+    ]
+
+
+def test_glob_item_accepts_include_and_exclude_lists(tree):
+    item = InjectItem(
+        glob=["x/**/*.json", "a.json"],
+        exclude="**/node_modules",
+        query="$.name",
+        template="{{ value }}",
+    )
+    item.set_base_path(tree)
+
+    assert resolve_query(item) == {"value": ["a.json", "x/c.json", "x/y/d.json"]}
+
+
+def test_exclude_requires_glob():
+    with pytest.raises(ValueError, match="'exclude' can only be used together with 'glob'"):
+        InjectItem(file="a.json", exclude="b.json", query="$", template="{{ value }}")
+
+
+def test_listings_are_shared_only_inside_one_pass(tmp_path):
+    (tmp_path / "1.json").write_text("{}")
+    pattern = f"{tmp_path}/*.json"
+
+    with shared_listings():
+        assert resolve_globs([pattern]) == [tmp_path / "1.json"]
+        (tmp_path / "2.json").write_text("{}")
+        assert resolve_globs([pattern]) == [tmp_path / "1.json"]
+
+    assert resolve_globs([pattern]) == [tmp_path / "1.json", tmp_path / "2.json"]
+    (tmp_path / "3.json").write_text("{}")
+    assert len(resolve_globs([pattern])) == 3
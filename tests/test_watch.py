@@ -0,0 +1,158 @@
+import json
+import os
+import sys
+from textwrap import dedent
+
+import pytest
+
+from doc_inject.config_loader import ExternalConfig
+from doc_inject.watch import RESCAN, InotifyWatcher, PollingWatcher, WatchSession
+
+
+def _project(tmp_path):
+    (tmp_path / "data.json").write_text(json.dumps({"uid": "abc", "title": "Ops"}))
+    (tmp_path / "dashboards").mkdir()
+    (tmp_path / "dashboards" / "db0.json").write_text(json.dumps({"title": "D0"}))
+
+    readme = tmp_path / "README.md"
+    readme.write_text(
+        dedent("""\
+        <!-- doc-inject:configure
+        {
+          "uid": {"file": "data.json", "query": "$.uid", "template": "UID: {{ value }}"},
+          "title": {"file": "data.json", "query": "$.title", "template": "Title: {{ value }}"},
+          "list": {
+            "glob": "dashboards/*.json",
+            "query": "$.title",
+            "template": "{% for t in value %}[{{ t }}]{% endfor %}"
+          }
+        }
+        -->
+        <!-- DOC_INJECT_START uid -->
+        <!-- DOC_INJECT_END uid -->
+        <!-- DOC_INJECT_START list -->
+        <!-- DOC_INJECT_END list -->
+    """)
+    )
+    return readme
+
+
+def test_session_renders_targets_and_tracks_sources(tmp_path):
+    readme = _project(tmp_path)
+    session = WatchSession([readme])
+
+    assert session.start() == [readme]
+    files, roots = session.watched()
+
+    assert os.path.realpath(tmp_path / "data.json") in files
+    assert os.path.realpath(readme) in files
+    assert roots == {os.path.realpath(tmp_path / "dashboards")}
+    assert "UID: abc" in readme.read_text()
+
+
+def test_source_change_rerenders_only_affected_blocks(tmp_path):
+    readme = _project(tmp_path)
+    session = WatchSession([readme])
+    session.start()
+
+    (tmp_path / "data.json").write_text(json.dumps({"uid": "xyz", "title": "Ops"}))
+    # simulate a stale list block to check it is not re-rendered
+    readme.write_text(readme.read_text().replace("[D0]", "[stale]"))
+    session._written[readme] = (os.stat(readme).st_mtime_ns, os.stat(readme).st_size)
+
+    assert session.handle({os.path.realpath(tmp_path / "data.json")}) == [readme]
+    result = readme.read_text()
+    assert "UID: xyz" in result
+    assert "[stale]" in result
+
+
+def test_created_file_reevaluates_glob(tmp_path):
+    readme = _project(tmp_path)
+    session = WatchSession([readme])
+    session.start()
+
+    created = tmp_path / "dashboards" / "db1.json"
+    created.write_text(json.dumps({"title": "D1"}))
+
+    assert session.handle({os.path.realpath(created)}) == [readme]
+    assert "[D0][D1]" in readme.read_text()
+    assert os.path.realpath(created) in session.watched()[0]
+
+
+@pytest.mark.parametrize("external", [False, True])
+def test_rescan_reevaluates_globs(tmp_path, external):
+    readme = _project(tmp_path)
+    config_path = None
+    if external:
+        config_path = tmp_path / "doc-inject.json"
+        config_path.write_text(
+            json.dumps(
+                {
+                    "list": {
+                        "glob": "dashboards/*.json",
+                        "query": "$.title",
+                        "template": "{{ value }}",
+                    }
+                }
+            )
+        )
+        readme.write_text("<!-- DOC_INJECT_START list -->\n<!-- DOC_INJECT_END list -->\n")
+    session = WatchSession(
+        [readme],
+        external=ExternalConfig.load(config_path) if external else None,
+    )
+    session.start()
+
+    (tmp_path / "dashboards" / "db1.json").write_text(json.dumps({"title": "D1"}))
+
+    assert session.handle({RESCAN}) == [readme]
+    assert "D1" in readme.read_text()
+
+
+def test_own_writes_are_ignored(tmp_path):
+    readme = _project(tmp_path)
+    session = WatchSession([readme])
+    session.start()
+
+    assert session.handle({os.path.realpath(readme)}) == []
+
+
+def test_polling_watcher_reports_modified_and_created_files(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text("{}")
+    (tmp_path / "dir").mkdir()
+
+    watcher = PollingWatcher(interval=0.01)
+    watcher.watch({str(source)}, {str(tmp_path / "dir")})
+    assert watcher.changes(timeout=0) == set()
+
+    source.write_text('{"changed": true}')
+    (tmp_path / "dir" / "new.json").write_text("{}")
+
+    assert watcher.changes(timeout=1) == {str(source), str(tmp_path / "dir" / "new.json")}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_reports_changes(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text("{}")
+    (tmp_path / "dir").mkdir()
+
+    watcher = InotifyWatcher()
+    try:
+        watcher.watch({str(source)}, {str(tmp_path / "dir")})
+        source.write_text('{"changed": true}')
+        (tmp_path / "dir" / "sub").mkdir()
+        (tmp_path / "dir" / "sub" / "new.json").write_text("{}")
+
+        changed = set()
+        while True:
+            events = watcher.changes(timeout=0.2)
+            if not events:
+                break
+            changed |= events
+    finally:
+        watcher.close()
+
+    assert str(source) in changed
+    assert str(tmp_path / "dir" / "sub") in changed